@@ -1,37 +1,44 @@
 import os
+import sys
 import time
 import json
+import threading
 from pathlib import Path
 from flask import Flask, request, jsonify
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from browser import LEAN_DRIVER, build_chrome_options, chrome_service, block_resources
+import waits
 
 
 COOKIES_FILE = "credentials/linkedin_cookies.json"
 WAIT_SEC = 15
 
 
-def setup_driver():
+def setup_driver(lean=LEAN_DRIVER):
     os.makedirs(os.path.dirname(COOKIES_FILE), exist_ok=True)
 
-    options = webdriver.ChromeOptions()
+    options = build_chrome_options(lean)
 
-    service = Service(ChromeDriverManager().install())
+    service = chrome_service()
     driver = webdriver.Chrome(service=service, options=options)
     wait = WebDriverWait(driver, WAIT_SEC)
-    driver.maximize_window()
+    if lean:
+        block_resources(driver)
+    else:
+        driver.maximize_window()
 
     return driver, wait
 
 
 def login_with_cookies(driver, wait_sec):
     driver.get("https://www.linkedin.com/")
-    time.sleep(3)
+    waits.document_ready(driver, "linkedin.home", WAIT_SEC)
 
     if os.path.exists(COOKIES_FILE):
         with open(COOKIES_FILE, "r", encoding="utf-8") as f:
@@ -44,7 +51,7 @@ def login_with_cookies(driver, wait_sec):
                 except Exception:
                     continue
         driver.refresh()
-        time.sleep(3)
+        waits.page_ready(driver, "linkedin.login_refresh", WAIT_SEC)
         print("Logged in with cookies.")
         return
     else:
@@ -65,7 +72,7 @@ def scrape_experience(driver, wait, profile_url):
                 '//*[@id="profile-content"]/div/div[2]/div/div/main/section/div[2]/div/div[1]/ul'
             ))
         )
-        time.sleep(WAIT_SEC)
+        waits.dom_quiet(driver, "linkedin.experience", WAIT_SEC)
 
         for hidden in exp_section.find_elements(By.CSS_SELECTOR, "span.visually-hidden"):
             driver.execute_script("arguments[0].remove();", hidden)
@@ -87,7 +94,7 @@ def scrape_education(driver, wait, profile_url):
                 '//*[@id="profile-content"]/div/div[2]/div/div/main/section/div[2]/div/div[1]/ul'
             ))
         )
-        time.sleep(WAIT_SEC)
+        waits.dom_quiet(driver, "linkedin.education", WAIT_SEC)
 
         for hidden in edu_section.find_elements(By.CSS_SELECTOR, "span.visually-hidden"):
             driver.execute_script("arguments[0].remove();", hidden)
@@ -109,7 +116,7 @@ def scrape_certifications(driver, wait, profile_url):
                 '//*[@id="profile-content"]/div/div[2]/div/div/main/section/div[2]/div/div[1]/ul'
             ))
         )
-        time.sleep(WAIT_SEC)
+        waits.dom_quiet(driver, "linkedin.certifications", WAIT_SEC)
 
         for hidden in cert_section.find_elements(By.CSS_SELECTOR, "span.visually-hidden"):
             driver.execute_script("arguments[0].remove();", hidden)
@@ -131,7 +138,7 @@ def scrape_skills(driver, wait, profile_url):
                 '//*[@id="ember50"]/div/div/div[1]/ul'
             ))
         )
-        time.sleep(WAIT_SEC)
+        waits.dom_quiet(driver, "linkedin.skills", WAIT_SEC)
 
         for hidden in skills_section.find_elements(By.CSS_SELECTOR, "span.visually-hidden"):
             driver.execute_script("arguments[0].remove();", hidden)
@@ -149,7 +156,8 @@ def scrape_posts(driver, wait, profile_url, total_posts=None):
     
     posts_url = profile_url.rstrip("/") + "/recent-activity/all/"
     driver.get(posts_url)
-    time.sleep(WAIT_SEC)
+    waits.until(driver, "linkedin.posts", lambda d: d.find_elements(By.CSS_SELECTOR, "ul.display-flex.flex-wrap.list-style-none.justify-center"), WAIT_SEC)
+    waits.dom_quiet(driver, "linkedin.posts_render", WAIT_SEC)
 
     posts = []
 
@@ -203,7 +211,7 @@ def scrape_posts(driver, wait, profile_url, total_posts=None):
 def scrape_biodata(driver, wait, profile_url, total_posts=None):
     driver.get(profile_url)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    time.sleep(2)
+    waits.dom_quiet(driver, "linkedin.profile", WAIT_SEC)
 
     biodata = {"username": profile_url.rstrip("/").split("/")[-1], "bio": "", "about": ""}
 
@@ -242,14 +250,50 @@ app = Flask(__name__)
 
 driver = None
 wait = None
+driver_lock = threading.RLock()
+driver_state = {"status": "cold", "error": None}
+
+def driver_is_alive():
+    try:
+        return driver is not None and driver.execute_script("return 1;") == 1
+    except Exception:
+        return False
 
 def initialize_driver(wait_sec):
     global driver, wait
-    if driver is None:
-        driver, wait = setup_driver()
-        login_with_cookies(driver, wait_sec)
+    with driver_lock:
+        if driver is not None and not driver_is_alive():
+            print("♻️ LinkedIn browser stopped responding, restarting it.")
+            try:
+                driver.quit()
+            except Exception:
+                pass
+            driver = None
+
+        if driver is None:
+            driver_state["status"] = "warming"
+            new_driver = None
+            try:
+                new_driver, new_wait = setup_driver()
+                login_with_cookies(new_driver, wait_sec)
+            except Exception as e:
+                driver_state.update(status="failed", error=str(e))
+                if new_driver is not None:
+                    new_driver.quit()
+                raise
+            driver, wait = new_driver, new_wait
+            driver_state.update(status="ready", error=None)
     return driver, wait
 
+def warm_up():
+    def run():
+        try:
+            initialize_driver(0)
+            print("🔥 LinkedIn browser warmed up.")
+        except Exception as e:
+            print(f"⚠️ LinkedIn browser warm-up failed: {e}")
+    threading.Thread(target=run, name="linkedin-warmup", daemon=True).start()
+
 @app.route('/scrape', methods=['POST'])
 def scrape():
     data = request.get_json()
@@ -262,6 +306,7 @@ def scrape():
     if not isinstance(urls, list):
         return jsonify({"error": "'urls' must be a list"}), 400
     
+    driver_lock.acquire()
     try:
         driver, wait = initialize_driver(0)
         
@@ -291,15 +336,20 @@ def scrape():
             response["errors"] = errors
             response["success"] = False
         
-        driver.quit()
         return jsonify(response)
         
     except Exception as e:
         return jsonify({"error": str(e), "success": False}), 500
+    finally:
+        driver_lock.release()
 
 @app.route('/sanity', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "service": "LinkedIn Scraper"})
+    return jsonify({"status": "ok", "service": "LinkedIn Scraper", "ready": driver_state["status"] == "ready", "browser": driver_state})
+
+@app.route('/waits', methods=['GET'])
+def wait_stats():
+    return jsonify({"service": "LinkedIn Scraper", "waits": waits.stats()})
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -308,7 +358,7 @@ def login():
     wait_sec = data.get('wait_sec', 30) if data else 30
     
     try:
-        temp_driver, temp_wait = setup_driver()
+        temp_driver, temp_wait = setup_driver(lean=False)
         login_with_cookies(temp_driver, wait_sec)
         
         return jsonify({"success": True, "message": "Login completed and browser closed"})
@@ -320,4 +370,6 @@ def login():
         temp_driver.quit()
 
 if __name__ == "__main__":
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
     app.run(debug=True, host="0.0.0.0", port=5002)
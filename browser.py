@@ -0,0 +1,172 @@
+import os
+import json
+import base64
+import weakref
+import threading
+from selenium import webdriver
+from selenium.webdriver.chrome.service import Service
+from selenium.common.exceptions import WebDriverException
+from webdriver_manager.chrome import ChromeDriverManager
+
+
+LEAN_DRIVER = os.getenv("LEAN_DRIVER", "1") == "1"
+WINDOW_SIZE = os.getenv("DRIVER_WINDOW_SIZE", "1920,1080")
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH")
+
+BLOCKED_RESOURCE_PATTERNS = [
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.svg*", "*.ico*",
+    "*.mp4*", "*.webm*", "*.m4s*", "*.m4a*", "*.mp3*",
+    "*.woff*", "*.ttf*", "*.otf*", "*.eot*",
+]
+
+BLOCKED_THIRD_PARTY_PATTERNS = [
+    "*doubleclick.net*",
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*googlesyndication.com*",
+    "*googleadservices.com*",
+    "*connect.facebook.net*",
+    "*scorecardresearch.com*",
+    "*hotjar.com*",
+    "*ads-twitter.com*",
+    "*ads-api.twitter.com*",
+    "*analytics.twitter.com*",
+    "*px.ads.linkedin.com*",
+    "*snap.licdn.com*",
+]
+
+
+_driver_path = None
+_driver_path_lock = threading.Lock()
+
+
+def chromedriver_path():
+    global _driver_path
+    with _driver_path_lock:
+        if _driver_path is None:
+            _driver_path = CHROMEDRIVER_PATH or ChromeDriverManager().install()
+            print(f"🧭 Using chromedriver at {_driver_path}")
+        return _driver_path
+
+
+def chrome_service():
+    return Service(chromedriver_path())
+
+
+def build_chrome_options(lean=LEAN_DRIVER, capture_network=False, user_data_dir=None):
+    options = webdriver.ChromeOptions()
+    if user_data_dir:
+        options.add_argument(f"--user-data-dir={os.path.abspath(user_data_dir)}")
+    if capture_network:
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if not lean:
+        return options
+
+    options.add_argument("--headless=new")
+    options.add_argument(f"--window-size={WINDOW_SIZE}")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--disable-extensions")
+    options.add_argument("--mute-audio")
+    options.add_argument("--blink-settings=imagesEnabled=false")
+    options.page_load_strategy = "eager"
+    options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.managed_default_content_settings.media_stream": 2,
+    })
+    return options
+
+
+_blocked = weakref.WeakKeyDictionary()
+
+
+def block_resources(driver, extra_patterns=()):
+    _blocked[driver] = list(extra_patterns)
+    patterns = BLOCKED_RESOURCE_PATTERNS + BLOCKED_THIRD_PARTY_PATTERNS + list(extra_patterns)
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": patterns})
+
+    user_agent = driver.execute_script("return navigator.userAgent;")
+    if "HeadlessChrome" in user_agent:
+        driver.execute_cdp_cmd("Network.setUserAgentOverride", {
+            "userAgent": user_agent.replace("HeadlessChrome", "Chrome")
+        })
+
+
+def reapply_blocking(driver):
+    if driver in _blocked:
+        block_resources(driver, _blocked[driver])
+
+
+class NetworkCapture:
+    def __init__(self, driver):
+        self.driver = weakref.proxy(driver)
+        self.pending = {}
+        self.backlog = {}
+        self.per_tab = False
+
+    def _entries(self):
+        try:
+            return self.driver.get_log("performance")
+        except WebDriverException:
+            return []
+
+    def _webview(self):
+        return self.driver.current_window_handle if self.per_tab else None
+
+    def _drain(self):
+        for entry in self._entries():
+            message = json.loads(entry["message"])
+            webview = message.get("webview") if self.per_tab else None
+            self.backlog.setdefault(webview, []).append(message["message"])
+
+    def _take(self, webview):
+        self._drain()
+        if webview is None:
+            messages = [m for queued in self.backlog.values() for m in queued]
+            self.backlog.clear()
+            return messages
+        return self.backlog.pop(webview, []) + self.backlog.pop(None, [])
+
+    def clear(self):
+        webview = self._webview()
+        self._take(webview)
+        self.pending.pop(webview, None)
+
+    def _body(self, request_id):
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+        except WebDriverException:
+            return None
+        text = base64.b64decode(body["body"]).decode("utf-8", "replace") if body.get("base64Encoded") else body["body"]
+        try:
+            return json.loads(text)
+        except ValueError:
+            return None
+
+    def poll(self, url_matches):
+        responses = []
+        webview = self._webview()
+        pending = self.pending.setdefault(webview, {})
+        for message in self._take(webview):
+            method = message.get("method")
+            params = message.get("params", {})
+            if method == "Network.responseReceived":
+                url = params["response"]["url"]
+                if url_matches(url):
+                    pending[params["requestId"]] = url
+            elif method == "Network.loadingFinished" and params.get("requestId") in pending:
+                url = pending.pop(params["requestId"])
+                payload = self._body(params["requestId"])
+                if payload is not None:
+                    responses.append((url, payload))
+        return responses
+
+
+_captures = weakref.WeakKeyDictionary()
+
+
+def network_capture(driver):
+    capture = _captures.get(driver)
+    if capture is None:
+        capture = _captures[driver] = NetworkCapture(driver)
+    return capture
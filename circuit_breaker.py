@@ -0,0 +1,90 @@
+import time
+import threading
+from collections import deque
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+class CircuitBreaker:
+    def __init__(self, name, window=50, error_threshold=0.5, min_calls=5, open_sec=30,
+                 default_timeout=300, min_timeout=10, max_timeout=300, timeout_margin=2.0):
+        self.name = name
+        self.samples = deque(maxlen=window)
+        self.error_threshold = error_threshold
+        self.min_calls = min_calls
+        self.open_sec = open_sec
+        self.default_timeout = default_timeout
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        self.timeout_margin = timeout_margin
+        self.state = "closed"
+        self.opened_at = None
+        self.probing = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.time() - self.opened_at >= self.open_sec:
+                self.state = "half_open"
+                print(f"🔌 {self.name} circuit half-open, probing")
+            if self.state == "half_open" and not self.probing:
+                self.probing = True
+                return True
+            return False
+
+    def cancel(self):
+        with self._lock:
+            self.probing = False
+
+    def _open(self):
+        self.state = "open"
+        self.opened_at = time.time()
+        self.probing = False
+        print(f"🔌 {self.name} circuit opened ({self._error_rate():.0%} errors)")
+
+    def _error_rate(self):
+        if not self.samples:
+            return 0.0
+        return sum(1 for ok, _ in self.samples if not ok) / len(self.samples)
+
+    def record(self, ok, elapsed, size=1):
+        with self._lock:
+            self.samples.append((ok, elapsed / max(1, size)))
+            if self.state == "half_open":
+                if ok:
+                    self.state = "closed"
+                    self.probing = False
+                    print(f"🔌 {self.name} circuit closed")
+                else:
+                    self._open()
+            elif self.state == "closed" and len(self.samples) >= self.min_calls and self._error_rate() >= self.error_threshold:
+                self._open()
+
+    def timeout(self, size=1):
+        with self._lock:
+            per_user = [elapsed for ok, elapsed in self.samples if ok]
+        if len(per_user) < self.min_calls:
+            return self.default_timeout
+        p99 = percentile(per_user, 99)
+        return max(self.min_timeout, min(self.max_timeout, p99 * max(1, size) * self.timeout_margin))
+
+    def stats(self):
+        with self._lock:
+            per_user = [elapsed for ok, elapsed in self.samples if ok]
+            state = {
+                "state": self.state,
+                "calls": len(self.samples),
+                "error_rate": round(self._error_rate(), 3),
+                "p50_sec_per_user": percentile(per_user, 50),
+                "p99_sec_per_user": percentile(per_user, 99),
+            }
+        state["timeout_sec_per_user"] = round(self.timeout(1), 2)
+        return state
@@ -0,0 +1,52 @@
+import math
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+_deadline_at = ContextVar("deadline_at", default=None)
+
+
+class DeadlineExceeded(Exception):
+    pass
+
+
+def from_seconds(seconds):
+    if seconds is None:
+        return None
+    seconds = float(seconds)
+    if not math.isfinite(seconds) or seconds < 0:
+        raise ValueError(f"Invalid deadline: {seconds}")
+    return time.time() + seconds
+
+
+@contextmanager
+def scope(deadline_at):
+    token = _deadline_at.set(deadline_at)
+    try:
+        yield
+    finally:
+        _deadline_at.reset(token)
+
+
+def current():
+    return _deadline_at.get()
+
+
+def remaining():
+    deadline_at = _deadline_at.get()
+    if deadline_at is None:
+        return None
+    return max(0.0, deadline_at - time.time())
+
+
+def expired():
+    deadline_at = _deadline_at.get()
+    return deadline_at is not None and time.time() >= deadline_at
+
+
+def clamp(timeout):
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(0.1, min(timeout, left))
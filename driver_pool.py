@@ -0,0 +1,154 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+
+class PooledDriver:
+    def __init__(self, driver, wait):
+        self.driver = driver
+        self.wait = wait
+        self.pages = 0
+        self.created_at = time.time()
+        self.last_used = self.created_at
+
+    def mark_page(self, count=1):
+        self.pages += count
+
+
+class DriverPool:
+    def __init__(self, factory, size=1, max_pages=200, checkout_timeout=300):
+        self.factory = factory
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.checkout_timeout = checkout_timeout
+        self.warm_state = "cold"
+        self.warm_error = None
+        self._idle = []
+        self._total = 0
+        self._cond = threading.Condition()
+
+    def _create(self):
+        driver, wait = self.factory()
+        return PooledDriver(driver, wait)
+
+    def _quit(self, session):
+        try:
+            session.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing pooled browser: {e}")
+
+    def _release_slot(self):
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+
+    def is_healthy(self, session):
+        try:
+            return session.driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def checkout(self, timeout=None):
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = time.time() + timeout
+        session = None
+
+        with self._cond:
+            while True:
+                if self._idle:
+                    session = self._idle.pop()
+                    break
+                if self._total < self.size:
+                    self._total += 1
+                    break
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    raise TimeoutError("No browser available in the pool")
+                self._cond.wait(remaining)
+
+        if session is not None and self.is_healthy(session):
+            return session
+
+        if session is not None:
+            print("♻️ Pooled browser failed health check, replacing it.")
+            self._quit(session)
+
+        try:
+            return self._create()
+        except Exception:
+            self._release_slot()
+            raise
+
+    def checkin(self, session, broken=False):
+        session.last_used = time.time()
+        if broken or session.pages >= self.max_pages:
+            if not broken:
+                print(f"♻️ Recycling browser after {session.pages} pages.")
+            self._quit(session)
+            self._release_slot()
+            return
+
+        with self._cond:
+            self._idle.append(session)
+            self._cond.notify()
+
+    @contextmanager
+    def session(self, timeout=None):
+        pooled = self.checkout(timeout)
+        broken = False
+        try:
+            yield pooled
+        except Exception:
+            broken = not self.is_healthy(pooled)
+            raise
+        finally:
+            self.checkin(pooled, broken=broken)
+
+    def warm_up(self, count=None):
+        count = self.size if count is None else max(0, min(count, self.size))
+        if count == 0:
+            return
+        self.warm_state = "warming"
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix="driver-warmup") as executor:
+            futures = [executor.submit(self.checkout) for _ in range(count)]
+
+        ready = 0
+        errors = []
+        for future in futures:
+            try:
+                self.checkin(future.result())
+                ready += 1
+            except Exception as e:
+                errors.append(str(e))
+
+        self.warm_error = errors[0] if errors else None
+        self.warm_state = "ready" if not errors else ("degraded" if ready else "failed")
+        print(f"🔥 Warmed up {ready}/{count} browsers in {time.time() - start:.1f}s")
+        if errors:
+            print(f"⚠️ Browser warm-up error: {errors[0]}")
+
+    def start_warm_up(self, count=None):
+        threading.Thread(target=self.warm_up, args=(count,), name="driver-warmup", daemon=True).start()
+
+    def close_all(self):
+        with self._cond:
+            idle = self._idle
+            self._idle = []
+            self._total -= len(idle)
+            self._cond.notify_all()
+        for session in idle:
+            self._quit(session)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "size": self.size,
+                "open": self._total,
+                "idle": len(self._idle),
+                "in_use": self._total - len(self._idle),
+                "warm_up": self.warm_state,
+                "warm_up_error": self.warm_error,
+            }
@@ -1,64 +1,391 @@
 import os
 import json
+import math
 import time
+import sqlite3
+import threading
+import contextvars
+from contextlib import contextmanager
 from pathlib import Path
+from urllib.parse import urlencode, urlparse, parse_qs
 import requests
+from requests.structures import CaseInsensitiveDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError, as_completed
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
+import deadline
+import timing
+import profiling
 
 
 load_dotenv(dotenv_path="credentials/github.env")
 TOKEN = os.getenv("GITHUB_TOKEN")
+RATE_LIMIT_RESERVE = int(os.getenv("GITHUB_RATE_LIMIT_RESERVE", 10))
+RATE_LIMIT_MAX_WAIT = int(os.getenv("GITHUB_RATE_LIMIT_MAX_WAIT", 3600))
 TOTAL_REPOS_TO_SCRAPE = int(os.getenv("TOTAL_REPOS_TO_SCRAPE", 5))
+GITHUB_CONCURRENCY = int(os.getenv("GITHUB_CONCURRENCY", 8))
+GITHUB_MAX_CONCURRENCY = int(os.getenv("GITHUB_MAX_CONCURRENCY", 32))
+GITHUB_BACKEND = os.getenv("GITHUB_BACKEND", "rest")
+GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", "https://api.github.com/graphql")
+GRAPHQL_BATCH_SIZE = int(os.getenv("GITHUB_GRAPHQL_BATCH_SIZE", 20))
+CACHE_DB = os.getenv("GITHUB_CACHE_DB", "data/github_cache.db")
+CACHE_MAX_BYTES = int(os.getenv("GITHUB_CACHE_MAX_BYTES", 100 * 1024 * 1024))
 
 headers = {
-    "Authorization": f"token {TOKEN}",
     "Accept": "application/vnd.github.v3+json"
 }
 
+
+def load_tokens():
+    tokens = [t.strip() for t in os.getenv("GITHUB_TOKENS", "").split(",")]
+    tokens.append(TOKEN)
+    i = 1
+    while os.getenv(f"GITHUB_TOKEN_{i}"):
+        tokens.append(os.getenv(f"GITHUB_TOKEN_{i}"))
+        i += 1
+
+    unique = []
+    for token in tokens:
+        if token and token not in unique:
+            unique.append(token)
+    return unique or [None]
+
+
+class RateLimitExceeded(Exception):
+    pass
+
+
+class TokenPool:
+    def __init__(self, tokens, reserve=RATE_LIMIT_RESERVE, max_wait=RATE_LIMIT_MAX_WAIT):
+        self.tokens = tokens
+        self.reserve = reserve
+        self.max_wait = max_wait
+        self.budgets = {token: {} for token in tokens}
+        self._lock = threading.Lock()
+
+    def _budget(self, token, resource):
+        return self.budgets[token].setdefault(resource, {"remaining": None, "limit": None, "reset": 0})
+
+    def acquire(self, resource="core"):
+        waited = 0
+        while True:
+            with self._lock:
+                now = time.time()
+                best_token = None
+                best_remaining = -1
+                earliest_reset = None
+                for token in self.tokens:
+                    budget = self._budget(token, resource)
+                    if budget["remaining"] is None or budget["reset"] <= now:
+                        remaining = budget["limit"] or 5000
+                    else:
+                        remaining = budget["remaining"]
+                        if remaining <= self.reserve and (earliest_reset is None or budget["reset"] < earliest_reset):
+                            earliest_reset = budget["reset"]
+                    if remaining > best_remaining:
+                        best_token, best_remaining = token, remaining
+
+                if best_remaining > self.reserve:
+                    budget = self._budget(best_token, resource)
+                    if budget["remaining"] is not None and budget["reset"] > now:
+                        budget["remaining"] -= 1
+                    return best_token
+
+            sleep_for = max(1, earliest_reset - now + 1)
+            left = deadline.remaining()
+            if waited + sleep_for > self.max_wait or (left is not None and sleep_for > left):
+                raise RateLimitExceeded(f"All GitHub tokens exhausted for '{resource}' until {time.ctime(earliest_reset)}")
+            print(f"⏳ All GitHub tokens exhausted for '{resource}', waiting {int(sleep_for)}s for reset...")
+            time.sleep(sleep_for)
+            waited += sleep_for
+
+    def update(self, token, response, resource="core"):
+        resource = response.headers.get("X-RateLimit-Resource", resource)
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        retry_after = response.headers.get("Retry-After")
+
+        with self._lock:
+            budget = self._budget(token, resource)
+            if remaining is not None and reset is not None:
+                budget["remaining"] = int(remaining)
+                budget["reset"] = int(reset)
+                if response.headers.get("X-RateLimit-Limit"):
+                    budget["limit"] = int(response.headers["X-RateLimit-Limit"])
+            if retry_after and response.status_code in (403, 429):
+                budget["remaining"] = 0
+                budget["reset"] = time.time() + int(retry_after)
+
+    def is_rate_limited(self, response):
+        if response.status_code not in (403, 429):
+            return False
+        return response.headers.get("X-RateLimit-Remaining") == "0" or "Retry-After" in response.headers
+
+    def stats(self):
+        with self._lock:
+            return [
+                {
+                    "token": f"...{token[-4:]}" if token else "anonymous",
+                    "budgets": {
+                        resource: {"remaining": b["remaining"], "limit": b["limit"], "reset": b["reset"]}
+                        for resource, b in budgets.items()
+                    }
+                }
+                for token, budgets in self.budgets.items()
+            ]
+
+
+token_pool = TokenPool(load_tokens())
+
+session = requests.Session()
+session.headers.update(headers)
+EXECUTOR_WIDTH = GITHUB_MAX_CONCURRENCY * 4
+adapter = HTTPAdapter(pool_connections=4, pool_maxsize=EXECUTOR_WIDTH * 2 + GITHUB_MAX_CONCURRENCY)
+session.mount("https://", adapter)
+
+call_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WIDTH, thread_name_prefix="github-call")
+page_executor = ThreadPoolExecutor(max_workers=EXECUTOR_WIDTH, thread_name_prefix="github-page")
+
+
+def github_request(method, url, resource="core", headers=None, **kwargs):
+    for _ in range(5):
+        if deadline.expired():
+            raise deadline.DeadlineExceeded(f"Deadline reached before GitHub request to {url}")
+        token = token_pool.acquire(resource)
+        request_headers = dict(headers or {})
+        if token:
+            request_headers["Authorization"] = f"token {token}"
+        with timing.span("github.http"):
+            r = session.request(method, url, headers=request_headers, **kwargs)
+        token_pool.update(token, r, resource)
+        if not token_pool.is_rate_limited(r):
+            return r
+        print(f"⚠️ GitHub rate limit hit on token {f'...{token[-4:]}' if token else 'anonymous'}, rotating.")
+    return r
+
+CACHED_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Link")
+
+
+class HttpCache:
+    def __init__(self, db_path, max_bytes):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "stored": 0, "evictions": 0}
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    headers TEXT NOT NULL,
+                    body BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def count(self, name, stats=None):
+        with self._lock:
+            self.counters[name] += 1
+            if stats is not None:
+                stats[name] = stats.get(name, 0) + 1
+
+    def lookup(self, key):
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT etag, last_modified, headers, body FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {"etag": row[0], "last_modified": row[1], "headers": json.loads(row[2]), "body": row[3]}
+
+    def touch(self, key):
+        with self._connect() as conn:
+            conn.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+
+    def store(self, key, response, stats=None):
+        body = response.content
+        stored_headers = {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers}
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, etag, last_modified, headers, body, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (key, response.headers.get("ETag"), response.headers.get("Last-Modified"),
+                 json.dumps(stored_headers), body, len(body), time.time()),
+            )
+            self.count("stored", stats)
+            self._evict(conn, stats)
+
+    def _evict(self, conn, stats=None):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        while total > self.max_bytes:
+            rows = conn.execute("SELECT key, size FROM responses ORDER BY last_access LIMIT 50").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                total -= size
+                self.count("evictions", stats)
+                if total <= self.max_bytes:
+                    break
+
+    def stats(self):
+        with self._connect() as conn:
+            entries, size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        with self._lock:
+            return {**self.counters, "entries": entries, "bytes": size}
+
+
+http_cache = HttpCache(CACHE_DB, CACHE_MAX_BYTES)
+request_cache_stats = contextvars.ContextVar("request_cache_stats", default=None)
+
+
+def submit(executor, fn, *args, **kwargs):
+    return executor.submit(profiling.bind(fn), *args, **kwargs)
+
+
+def cache_key(url, params=None, accept=None):
+    query = urlencode(sorted((params or {}).items()))
+    return f"{url}?{query}|{accept or headers['Accept']}"
+
+
+def cached_response(live, cached):
+    response = requests.Response()
+    response.status_code = 200
+    response.url = live.url
+    response.request = live.request
+    response.encoding = "utf-8"
+    response.headers = CaseInsensitiveDict({**live.headers, **cached["headers"]})
+    response._content = cached["body"]
+    return response
+
+
+def github_get(url, params=None, accept=None):
+    key = cache_key(url, params, accept)
+    stats = request_cache_stats.get()
+    cached = http_cache.lookup(key)
+
+    request_headers = {}
+    if accept:
+        request_headers["Accept"] = accept
+    if cached:
+        if cached["etag"]:
+            request_headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            request_headers["If-Modified-Since"] = cached["last_modified"]
+
+    r = github_request("GET", url, params=params, headers=request_headers)
+    if r.status_code == 304 and cached:
+        http_cache.count("hits", stats)
+        http_cache.touch(key)
+        return cached_response(r, cached)
+
+    http_cache.count("misses", stats)
+    if r.status_code == 200 and ("ETag" in r.headers or "Last-Modified" in r.headers):
+        http_cache.store(key, r, stats)
+    return r
+
+
+@timing.timed("github.user")
 def get_user(username):
     url = f"https://api.github.com/users/{username}"
-    r = requests.get(url, headers=headers)
+    r = github_get(url)
     r.raise_for_status()
     return r.json()
 
 
-def get_repos(username, limit=TOTAL_REPOS_TO_SCRAPE):
-    repos = []
-    page = 1
-    while len(repos) < limit:
-        url = f"https://api.github.com/users/{username}/repos"
-        r = requests.get(url, headers=headers, params={"per_page": 100, "page": page})
-        r.raise_for_status()
-        data = r.json()
-        if not data:
+def fetch_page(url, page, per_page, params=None):
+    r = github_get(url, params={**(params or {}), "per_page": per_page, "page": page})
+    r.raise_for_status()
+    return r.json(), r
+
+
+def last_page_from_links(response):
+    last = response.links.get("last")
+    if not last:
+        return None
+    page = parse_qs(urlparse(last["url"]).query).get("page")
+    return int(page[0]) if page else None
+
+
+def paginate(url, limit, max_pages=None, params=None):
+    if limit <= 0:
+        return []
+    per_page = min(100, limit)
+    pages_needed = math.ceil(limit / per_page)
+    if max_pages:
+        pages_needed = min(pages_needed, max_pages)
+
+    items, first = fetch_page(url, 1, per_page, params)
+    if len(items) >= limit or len(items) < per_page:
+        return items[:limit]
+
+    last_page = last_page_from_links(first)
+    if last_page is None:
+        return items[:limit]
+
+    pages = range(2, min(last_page, pages_needed) + 1)
+    futures = {submit(page_executor, fetch_page, url, page, per_page, params): page for page in pages}
+    fetched = {}
+    try:
+        for future in as_completed(futures):
+            data, _ = future.result()
+            fetched[futures[future]] = data
+
+            collected = len(items)
+            for page in pages:
+                if page not in fetched:
+                    break
+                collected += len(fetched[page])
+            if collected >= limit or deadline.expired():
+                break
+    finally:
+        for future in futures:
+            future.cancel()
+
+    for page in pages:
+        if page not in fetched:
             break
-        repos.extend(data)
-        page += 1
-    return repos[:limit]
+        items.extend(fetched[page])
+        if len(fetched[page]) < per_page:
+            break
+    return items[:limit]
 
 
+@timing.timed("github.repos")
+def get_repos(username, limit=TOTAL_REPOS_TO_SCRAPE):
+    url = f"https://api.github.com/users/{username}/repos"
+    return paginate(url, limit)
+
+
+@timing.timed("github.readme")
 def get_profile_readme(username):
     url = f"https://api.github.com/repos/{username}/{username}/readme"
-    r = requests.get(url, headers={**headers, "Accept": "application/vnd.github.v3.raw"})
+    r = github_get(url, accept="application/vnd.github.v3.raw")
     if r.status_code == 200:
         return r.text
     return None
 
 
+@timing.timed("github.contributions")
 def get_contributions_last_year(username):
     url = f"https://api.github.com/users/{username}/events/public"
-    contributions = []
-    page = 1
-    
-    while page <= 3:
-        r = requests.get(url, headers=headers, params={"per_page": 100, "page": page})
-        r.raise_for_status()
-        data = r.json()
-        if not data:
-            break
-        contributions.extend(data)
-        page += 1
+    contributions = paginate(url, 300, max_pages=3)
     
     from collections import Counter
     from datetime import datetime
@@ -75,16 +402,26 @@ def get_contributions_last_year(username):
     }
 
 
+@timing.timed("github.profile")
 def scrape_github_user(username, total_repos=None):
     if total_repos is None:
         total_repos = TOTAL_REPOS_TO_SCRAPE
 
     print(f"🔎 Scraping GitHub user: {username}")
-    user_data = get_user(username)
-    repos = get_repos(username, limit=total_repos)
-    readme = get_profile_readme(username)
-    contributions = get_contributions_last_year(username)
+    user_future = submit(call_executor, get_user, username)
+    repos_future = submit(call_executor, get_repos, username, limit=total_repos)
+    readme_future = submit(call_executor, get_profile_readme, username)
+    contributions_future = submit(call_executor, get_contributions_last_year, username)
+
+    user_data = user_future.result()
+    repos = repos_future.result()
+    readme = readme_future.result()
+    contributions = contributions_future.result()
+
+    return build_biodata(user_data, repos, readme, contributions)
+
 
+def build_biodata(user_data, repos, readme, contributions):
     biodata = {
         "user": {
             "name": user_data.get("name"),
@@ -112,36 +449,278 @@ def scrape_github_user(username, total_repos=None):
     return biodata
 
 
+GRAPHQL_USER_FRAGMENT = """
+fragment UserFields on User {
+  name
+  login
+  bio
+  publicRepos: repositories(privacy: PUBLIC, ownerAffiliations: OWNER) {
+    totalCount
+  }
+  repos: repositories(first: $repoLimit, privacy: PUBLIC, ownerAffiliations: OWNER, orderBy: {field: NAME, direction: ASC}) {
+    nodes {
+      name
+      stargazerCount
+      forkCount
+      url
+      pushedAt
+    }
+  }
+  contributionsCollection {
+    totalCommitContributions
+    totalIssueContributions
+    totalPullRequestContributions
+    totalPullRequestReviewContributions
+    totalRepositoryContributions
+    contributionCalendar {
+      totalContributions
+      weeks {
+        contributionDays {
+          date
+          contributionCount
+        }
+      }
+    }
+  }
+}
+"""
+
+# Contribution totals reported under the closest REST event type names.
+GRAPHQL_CONTRIBUTION_TYPES = {
+    "totalCommitContributions": "PushEvent",
+    "totalIssueContributions": "IssuesEvent",
+    "totalPullRequestContributions": "PullRequestEvent",
+    "totalPullRequestReviewContributions": "PullRequestReviewEvent",
+    "totalRepositoryContributions": "CreateEvent",
+}
+
+
+def build_graphql_query(usernames):
+    variables = ["$repoLimit: Int!"]
+    blocks = []
+    for i in range(len(usernames)):
+        variables.append(f"$login{i}: String!")
+        blocks.append(
+            f"  u{i}: user(login: $login{i}) {{\n"
+            f"    ...UserFields\n"
+            f"    readme: repository(name: $login{i}) {{\n"
+            f"      object(expression: \"HEAD:README.md\") {{ ... on Blob {{ text }} }}\n"
+            f"    }}\n"
+            f"  }}"
+        )
+    return f"query({', '.join(variables)}) {{\n" + "\n".join(blocks) + "\n}\n" + GRAPHQL_USER_FRAGMENT
+
+
+def graphql_user_to_biodata(node):
+    collection = node["contributionsCollection"]
+    calendar = collection["contributionCalendar"]
+    contribution_days = {
+        day["date"]: day["contributionCount"]
+        for week in calendar["weeks"]
+        for day in week["contributionDays"]
+        if day["contributionCount"]
+    }
+    events_by_type = {
+        event_type: collection[field]
+        for field, event_type in GRAPHQL_CONTRIBUTION_TYPES.items()
+        if collection.get(field)
+    }
+    readme_object = (node.get("readme") or {}).get("object") or {}
+
+    user_data = {
+        "name": node.get("name"),
+        "login": node.get("login"),
+        "bio": node.get("bio"),
+        "public_repos": node["publicRepos"]["totalCount"],
+    }
+    repos = [
+        {
+            "name": repo["name"],
+            "stargazers_count": repo["stargazerCount"],
+            "forks_count": repo["forkCount"],
+            "html_url": repo["url"],
+            "pushed_at": repo["pushedAt"],
+        }
+        for repo in node["repos"]["nodes"]
+    ]
+    contributions = {
+        "total_events": calendar["totalContributions"],
+        "contribution_days": contribution_days,
+        "events_by_type": events_by_type,
+    }
+    return build_biodata(user_data, repos, readme_object.get("text"), contributions)
+
+
+@timing.timed("github.graphql_batch")
+def scrape_github_users_graphql(usernames, total_repos=None):
+    if total_repos is None:
+        total_repos = TOTAL_REPOS_TO_SCRAPE
+
+    print(f"🔎 Scraping {len(usernames)} GitHub users via GraphQL")
+    variables = {"repoLimit": min(max(int(total_repos), 1), 100)}
+    for i, username in enumerate(usernames):
+        variables[f"login{i}"] = username
+
+    r = github_request("POST", GRAPHQL_URL, "graphql", json={"query": build_graphql_query(usernames), "variables": variables})
+    r.raise_for_status()
+    payload = r.json()
+
+    errors_by_alias = {}
+    for err in payload.get("errors") or []:
+        path = err.get("path") or []
+        if not path:
+            raise RuntimeError(f"GraphQL error: {err.get('message')}")
+        errors_by_alias.setdefault(path[0], err.get("message"))
+
+    data = payload.get("data") or {}
+    results = []
+    for i, username in enumerate(usernames):
+        node = data.get(f"u{i}")
+        if node is None:
+            results.append((username, None, errors_by_alias.get(f"u{i}", "User not found")))
+        else:
+            results.append((username, graphql_user_to_biodata(node), None))
+    return results
+
+
+def unreached_records(indexed_usernames):
+    return [{"type": "unreached", "index": i, "username": u} for i, u in indexed_usernames]
+
+
+def scrape_batch_indexed(indexed_usernames, total_repos, timings=False):
+    if deadline.expired():
+        return unreached_records(indexed_usernames)
+    try:
+        with timing.collect(timings) as batch_timings:
+            batch = scrape_github_users_graphql([u for _, u in indexed_usernames], total_repos=total_repos)
+    except deadline.DeadlineExceeded:
+        return unreached_records(indexed_usernames)
+    except Exception as e:
+        return [{"type": "error", "index": i, "username": u, "error": str(e)} for i, u in indexed_usernames]
+
+    share = None
+    if batch_timings is not None:
+        found = max(1, sum(1 for _, _, error in batch if not error))
+        share = {stage: seconds / found for stage, seconds in timing.rounded(batch_timings).items()}
+
+    records = []
+    for (index, _), (username, biodata, error) in zip(indexed_usernames, batch):
+        if error:
+            records.append({"type": "error", "index": index, "username": username, "error": error})
+        else:
+            if share is not None:
+                biodata["timings"] = timing.rounded(share)
+            records.append({"type": "result", "index": index, "username": username, "data": biodata})
+    return records
+
+
+def scrape_indexed(index, username, total_repos, timings=False):
+    if deadline.expired():
+        return unreached_records([(index, username)])[0]
+    try:
+        with timing.collect(timings) as user_timings:
+            biodata = scrape_github_user(username, total_repos=total_repos)
+        if user_timings is not None:
+            biodata["timings"] = timing.rounded(user_timings)
+        return {"type": "result", "index": index, "username": username, "data": biodata}
+    except deadline.DeadlineExceeded:
+        return unreached_records([(index, username)])[0]
+    except Exception as e:
+        return {"type": "error", "index": index, "username": username, "error": str(e)}
+
+
+def iter_scrape(usernames, total_repos, concurrency=GITHUB_CONCURRENCY, backend=GITHUB_BACKEND, cache_stats=None, deadline_at=None, timings=False):
+    stats_token = request_cache_stats.set(cache_stats)
+    executor = ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(usernames) or 1)), thread_name_prefix="github-user")
+    try:
+        with deadline.scope(deadline_at):
+            indexed = list(enumerate(usernames))
+            if backend == "graphql":
+                batches = [indexed[i:i + GRAPHQL_BATCH_SIZE] for i in range(0, len(indexed), GRAPHQL_BATCH_SIZE)]
+                futures = {submit(executor, scrape_batch_indexed, batch, total_repos, timings): batch for batch in batches}
+            else:
+                futures = {submit(executor, scrape_indexed, i, username, total_repos, timings): [(i, username)] for i, username in indexed}
+
+            pending = set(futures)
+            try:
+                for future in as_completed(futures, timeout=deadline.remaining()):
+                    pending.discard(future)
+                    records = future.result()
+                    yield from (records if isinstance(records, list) else [records])
+            except FutureTimeoutError:
+                print(f"⏱️ Deadline reached with {len(pending)} GitHub jobs still running")
+                for future in pending:
+                    yield from unreached_records(futures[future])
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        request_cache_stats.reset(stats_token)
+
+
+def parse_scrape_request(data):
+    if not data or 'usernames' not in data:
+        return None, (jsonify({"error": "Please provide 'usernames' in request body"}), 400)
+    
+    if not isinstance(data['usernames'], list):
+        return None, (jsonify({"error": "'usernames' must be a list"}), 400)
+    
+    return data['usernames'], None
+
+
+def parse_deadline(data):
+    try:
+        return deadline.from_seconds(data.get('deadline_sec')), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'deadline_sec' must be a non-negative number"}), 400)
+
+
+def parse_concurrency(data):
+    try:
+        return max(1, min(int(data.get('concurrency', GITHUB_CONCURRENCY)), GITHUB_MAX_CONCURRENCY)), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'concurrency' must be an integer"}), 400)
+
+
 app = Flask(__name__)
+profiling.install(app, "github")
 
 @app.route('/scrape', methods=['POST'])
 def scrape():
     data = request.get_json()
-    
-    if not data or 'usernames' not in data:
-        return jsonify({"error": "Please provide 'usernames' in request body"}), 400
-    
-    usernames = data['usernames']
-    if not isinstance(usernames, list):
-        return jsonify({"error": "'usernames' must be a list"}), 400
+    usernames, error = parse_scrape_request(data)
+    if error:
+        return error
     
     total_repos = data.get('total_repos', 5)
+    concurrency, error = parse_concurrency(data)
+    if error:
+        return error
+    backend = data.get('backend', GITHUB_BACKEND)
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
 
     results = []
     errors = []
+    unreached = []
+    cache_stats = {"hits": 0, "misses": 0}
     
-    for username in usernames:
-        try:
-            biodata = scrape_github_user(username, total_repos=total_repos)
-            results.append(biodata)
-            time.sleep(1)
-        except Exception as e:
-            errors.append({"username": username, "error": str(e)})
+    records = sorted(iter_scrape(usernames, total_repos, concurrency, backend, cache_stats, deadline_at, timings), key=lambda r: r["index"])
+    for record in records:
+        if record["type"] == "result":
+            results.append(record["data"])
+        elif record["type"] == "unreached":
+            unreached.append(record["username"])
+        else:
+            errors.append({"username": record["username"], "error": record["error"]})
     
     response = {
         "success": True,
         "scraped": len(results),
         "results": results,
+        "cache": cache_stats,
+        "truncated": bool(unreached) or (deadline_at is not None and time.time() >= deadline_at),
+        "unreached": unreached,
     }
     
     if errors:
@@ -150,9 +729,48 @@ def scrape():
     
     return jsonify(response)
 
+@app.route('/scrape/stream', methods=['POST'])
+def scrape_stream():
+    data = request.get_json()
+    usernames, error = parse_scrape_request(data)
+    if error:
+        return error
+    
+    total_repos = data.get('total_repos', 5)
+    concurrency, error = parse_concurrency(data)
+    if error:
+        return error
+    backend = data.get('backend', GITHUB_BACKEND)
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
+
+    def generate():
+        scraped = 0
+        errors = 0
+        unreached = []
+        cache_stats = {"hits": 0, "misses": 0}
+        for record in iter_scrape(usernames, total_repos, concurrency, backend, cache_stats, deadline_at, timings):
+            if record["type"] == "result":
+                scraped += 1
+            elif record["type"] == "unreached":
+                unreached.append(record["username"])
+            else:
+                errors += 1
+            yield json.dumps({k: v for k, v in record.items() if k != "index"}) + "\n"
+        truncated = bool(unreached) or (deadline_at is not None and time.time() >= deadline_at)
+        yield json.dumps({"type": "summary", "scraped": scraped, "errors": errors, "truncated": truncated, "unreached": unreached, "success": errors == 0, "cache": cache_stats}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(timing.render_metrics("github"), mimetype="text/plain; version=0.0.4")
+
 @app.route('/sanity', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "service": "GitHub Scraper"})
+    return jsonify({"status": "ok", "service": "GitHub Scraper", "cache": http_cache.stats(), "tokens": token_pool.stats()})
 
 if __name__ == "__main__":
     app.run(debug=True, host="0.0.0.0", port=5000)
\ No newline at end of file
@@ -1,180 +1,590 @@
+import os
+import json
 import time
-from flask import Flask, request, jsonify
+import queue
+import threading
+from flask import Flask, Response, request, jsonify, stream_with_context
 import requests
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from jobs import JobQueue
+from result_cache import ResultCache, normalize_username
+from replicas import ReplicaSet, ReplicaUnavailable, parse_replicas
+from circuit_breaker import CircuitBreaker
+from health import HealthChecker
+import deadline
+import timing
+import profiling
 
 app = Flask(__name__)
+profiling.install(app, "handler")
 GITHUB_PORT = 5000
 INSTAGRAM_PORT = 5001
 XTWITTER_PORT = 5003
+SHARD_SIZE = int(os.getenv("SHARD_SIZE", 0))
+REPLICA_CONCURRENCY = int(os.getenv("REPLICA_CONCURRENCY", 2))
+REPLICA_ACQUIRE_TIMEOUT = float(os.getenv("REPLICA_ACQUIRE_TIMEOUT", 60))
+JOBS_DB = os.getenv("JOBS_DB", "data/jobs.db")
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", 4))
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB", "data/results_cache.db")
+RESULT_CACHE_TTL = int(os.getenv("RESULT_CACHE_TTL", 3600))
+RESULT_CACHE_MAX_ENTRIES = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 5000))
+COALESCE_WAIT_SEC = float(os.getenv("COALESCE_WAIT_SEC", 330))
+RESULT_CACHE_STALE_SEC = int(os.getenv("RESULT_CACHE_STALE_SEC", 86400))
+CIRCUIT_ERROR_THRESHOLD = float(os.getenv("CIRCUIT_ERROR_THRESHOLD", 0.5))
+CIRCUIT_MIN_CALLS = int(os.getenv("CIRCUIT_MIN_CALLS", 5))
+CIRCUIT_OPEN_SEC = int(os.getenv("CIRCUIT_OPEN_SEC", 30))
+SCRAPER_MIN_TIMEOUT = int(os.getenv("SCRAPER_MIN_TIMEOUT", 30))
+SCRAPER_MAX_TIMEOUT = int(os.getenv("SCRAPER_MAX_TIMEOUT", 300))
+DEADLINE_MARGIN_SEC = float(os.getenv("DEADLINE_MARGIN_SEC", 2))
+DEADLINE_GRACE_SEC = float(os.getenv("DEADLINE_GRACE_SEC", 15))
+HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", 5))
+HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", 2))
 
-def call_github_scraper(github_usernames, total_posts):
-    print(f"🔎 Calling GitHub scraper for {len(github_usernames)} users...")
+replica_sets = {
+    platform: ReplicaSet(
+        platform,
+        parse_replicas(os.getenv(f"{platform.upper()}_REPLICAS"), f"http://localhost:{port}"),
+        REPLICA_CONCURRENCY,
+        shard_size=int(os.getenv(f"{platform.upper()}_SHARD_SIZE", SHARD_SIZE)),
+        acquire_timeout=REPLICA_ACQUIRE_TIMEOUT,
+    )
+    for platform, port in (("github", GITHUB_PORT), ("instagram", INSTAGRAM_PORT), ("xtwitter", XTWITTER_PORT))
+}
+
+result_cache = ResultCache(RESULT_CACHE_DB, ttl_sec=RESULT_CACHE_TTL, max_entries=RESULT_CACHE_MAX_ENTRIES, stale_sec=RESULT_CACHE_STALE_SEC)
+
+breakers = {
+    platform: CircuitBreaker(
+        platform,
+        error_threshold=CIRCUIT_ERROR_THRESHOLD,
+        min_calls=CIRCUIT_MIN_CALLS,
+        open_sec=CIRCUIT_OPEN_SEC,
+        default_timeout=SCRAPER_MAX_TIMEOUT,
+        min_timeout=SCRAPER_MIN_TIMEOUT,
+        max_timeout=SCRAPER_MAX_TIMEOUT,
+    )
+    for platform in replica_sets
+}
+
+health_checker = HealthChecker(
+    {platform: replicas.urls for platform, replicas in replica_sets.items()},
+    interval_sec=HEALTH_CHECK_INTERVAL,
+    timeout_sec=HEALTH_CHECK_TIMEOUT,
+    collectors={"result_cache": result_cache.stats},
+)
+
+def post_scraper(platform, label, url, payload, timeout=300):
     try:
-        response = requests.post(
-            f"http://localhost:{GITHUB_PORT}/scrape",
-            json={"usernames": github_usernames, "total_repos": total_posts},
-            timeout=300
-        )
+        response = requests.post(f"{url}/scrape", json=payload, timeout=timeout)
         if response.status_code == 200:
-            return {"platform": "github", "data": response.json(), "success": True}
+            return {"platform": platform, "data": response.json(), "success": True}
         else:
             return {
-                "platform": "github",
+                "platform": platform,
                 "success": False,
-                "error": f"GitHub scraper returned status {response.status_code}"
+                "error": f"{label} scraper returned status {response.status_code}"
             }
     except Exception as e:
         return {
-            "platform": "github",
+            "platform": platform,
             "success": False,
-            "error": f"Failed to call GitHub scraper: {str(e)}"
+            "error": f"Failed to call {label} scraper: {str(e)}"
         }
 
-def call_instagram_scraper(instagram_urls, total_posts):
-    print(f"🔎 Calling Instagram scraper for {len(instagram_urls)} users...")
-    try:
-        response = requests.post(
-            f"http://localhost:{INSTAGRAM_PORT}/scrape",
-            json={"usernames": instagram_urls, "total_posts": total_posts},
-            timeout=300
-        )
-        if response.status_code == 200:
-            return {"platform": "instagram", "data": response.json(), "success": True}
+def unreached_outcome(platform, chunk):
+    return {"platform": platform, "success": True, "data": {"results": [], "errors": [], "unreached": list(chunk), "truncated": True}}
+
+def call_replicas(platform, label, usernames, build_payload, deadline_at=None):
+    replicas = replica_sets[platform]
+    chunks = replicas.shards(usernames)
+    
+    breaker = breakers[platform]
+    
+    def call_chunk(chunk):
+        if deadline_at is not None and time.time() >= deadline_at:
+            return unreached_outcome(platform, chunk)
+        if not breaker.allow():
+            return {"platform": platform, "success": False, "unavailable": True, "error": f"{label} circuit is open, failing fast"}
+        acquire_timeout = replicas.acquire_timeout if deadline_at is None else max(0, min(replicas.acquire_timeout, deadline_at - time.time()))
+        try:
+            with replicas.replica(acquire_timeout) as url:
+                payload = build_payload(chunk)
+                timeout = breaker.timeout(len(chunk))
+                if deadline_at is not None:
+                    left = deadline_at - time.time()
+                    if left <= 0:
+                        breaker.cancel()
+                        return unreached_outcome(platform, chunk)
+                    payload["deadline_sec"] = max(0.1, left - DEADLINE_MARGIN_SEC)
+                    timeout = min(timeout, left + DEADLINE_GRACE_SEC)
+                start = time.time()
+                outcome = post_scraper(platform, label, url, payload, timeout=timeout)
+        except ReplicaUnavailable as e:
+            breaker.cancel()
+            if deadline_at is not None and time.time() >= deadline_at:
+                return unreached_outcome(platform, chunk)
+            return {"platform": platform, "success": False, "unavailable": True, "error": str(e)}
+        
+        if deadline_at is not None and not outcome["success"] and time.time() >= deadline_at:
+            breaker.cancel()
+            return unreached_outcome(platform, chunk)
+        if outcome["success"] and outcome["data"].get("truncated"):
+            breaker.cancel()
+            return outcome
+        breaker.record(outcome["success"], time.time() - start, len(chunk))
+        if not outcome["success"]:
+            outcome["unavailable"] = True
+        return outcome
+    
+    if len(chunks) == 1:
+        return call_chunk(chunks[0])
+    
+    print(f"🔀 Sharding {len(usernames)} {label} users into {len(chunks)} chunks across {len(replicas.urls)} replicas")
+    with ThreadPoolExecutor(max_workers=min(len(chunks), replicas.capacity)) as executor:
+        outcomes = [future.result() for future in [executor.submit(profiling.bind(call_chunk), chunk) for chunk in chunks]]
+    
+    if not any(outcome["success"] for outcome in outcomes):
+        return outcomes[0]
+    
+    merged = {"results": [], "errors": [], "unreached": [], "truncated": False}
+    for chunk, outcome in zip(chunks, outcomes):
+        if outcome["success"]:
+            merged["results"].extend(outcome["data"].get("results", []))
+            merged["errors"].extend(outcome["data"].get("errors", []))
+            merged["unreached"].extend(outcome["data"].get("unreached", []))
+            merged["truncated"] = merged["truncated"] or bool(outcome["data"].get("truncated"))
         else:
-            return {
-                "platform": "instagram",
-                "success": False,
-                "error": f"Instagram scraper returned status {response.status_code}"
-            }
-    except Exception as e:
-        return {
-            "platform": "instagram",
-            "success": False,
-            "error": f"Failed to call Instagram scraper: {str(e)}"
-        }
+            merged["errors"].extend({"username": username, "error": outcome["error"], "unavailable": True} for username in chunk)
+    merged["success"] = not merged["errors"]
+    merged["scraped"] = len(merged["results"])
+    return {"platform": platform, "data": merged, "success": True}
+
+@timing.timed("handler.github")
+def call_github_scraper(github_usernames, total_posts, deadline_at=None, timings=False):
+    print(f"🔎 Calling GitHub scraper for {len(github_usernames)} users...")
+    return call_replicas("github", "GitHub", github_usernames, lambda chunk: {"usernames": chunk, "total_repos": total_posts, "timings": timings}, deadline_at)
 
-def call_xtwitter_scraper(xtwitter_urls, total_posts):
+@timing.timed("handler.instagram")
+def call_instagram_scraper(instagram_urls, total_posts, deadline_at=None, timings=False):
+    print(f"🔎 Calling Instagram scraper for {len(instagram_urls)} users...")
+    return call_replicas("instagram", "Instagram", instagram_urls, lambda chunk: {"usernames": chunk, "total_posts": total_posts, "timings": timings}, deadline_at)
+
+@timing.timed("handler.xtwitter")
+def call_xtwitter_scraper(xtwitter_urls, total_posts, deadline_at=None, timings=False):
     print(f"🔎 Calling Twitter scraper for {len(xtwitter_urls)} users...")
-    try:
-        response = requests.post(
-            f"http://localhost:{XTWITTER_PORT}/scrape",
-            json={"usernames": xtwitter_urls, "total_posts": total_posts},
-            timeout=300
-        )
-        if response.status_code == 200:
-            return {"platform": "xtwitter", "data": response.json(), "success": True}
+    return call_replicas("xtwitter", "Twitter", xtwitter_urls, lambda chunk: {"usernames": chunk, "total_posts": total_posts, "timings": timings}, deadline_at)
+
+def result_username(result):
+    return (result.get("user") or {}).get("username") or result.get("username")
+
+def match_records(usernames, platform_data):
+    records = {}
+    for username in platform_data.get("unreached", []):
+        if username in usernames:
+            records[username] = {"type": "unreached", "username": username}
+    for err in platform_data.get("errors", []):
+        if err.get("username") in usernames and err["username"] not in records:
+            records[err["username"]] = {"type": "error", **err}
+    
+    unmatched = {normalize_username(u): u for u in usernames if u not in records}
+    for result in platform_data.get("results", []):
+        username = unmatched.pop(normalize_username(result_username(result)), None)
+        if username is None:
+            print(f"⚠️ Dropping result for unrequested or duplicate user {result_username(result)!r}")
         else:
-            return {
-                "platform": "xtwitter",
-                "success": False,
-                "error": f"Twitter scraper returned status {response.status_code}"
-            }
-    except Exception as e:
-        return {
-            "platform": "xtwitter",
-            "success": False,
-            "error": f"Failed to call Twitter scraper: {str(e)}"
-        }
+            records[username] = {"type": "result", "username": username, "data": result}
+    
+    for username in usernames:
+        if username not in records:
+            records[username] = {"type": "error", "username": username, "error": "No result returned by scraper"}
+    return records
 
-@app.route('/scrape_all', methods=['POST'])
-def scrape_all():
-    data = request.get_json()
+def cached_scrape(platform, call_scraper, usernames, total_posts, use_cache=True, deadline_at=None, timings=False):
+    keys = {u: ResultCache.key(platform, u, total_posts) for u in dict.fromkeys(usernames)}
+    records = {}
     
-    if not data:
-        return jsonify({"error": "No data provided"}), 400
+    if use_cache:
+        for username, key in keys.items():
+            data = result_cache.get(key)
+            if data is not None:
+                records[username] = {"type": "result", "username": username, "data": data}
+    
+    owners = {}
+    for username, key in keys.items():
+        if username not in records:
+            owners.setdefault(key, username)
+    leading, following = result_cache.claim(list(owners))
+    leaders = [owners[key] for key in leading]
+    result_cache.count("hits", len(records))
+    result_cache.count("misses", len(leaders))
+    result_cache.count("coalesced", len(following))
+    cache_info = {"hits": len(records), "misses": len(leaders), "coalesced": len(following), "stale": 0}
+    
+    failure = None
+    truncated = False
+    if leaders:
+        matched = {}
+        try:
+            result = call_scraper(leaders, total_posts, deadline_at, timings)
+            if result["success"]:
+                matched = match_records(leaders, result["data"])
+                truncated = bool(result["data"].get("truncated"))
+            else:
+                failure = result
+        finally:
+            for username in leaders:
+                error = failure["error"] if failure else "Scrape did not complete"
+                record = matched.get(username) or {"type": "error", "username": username, "error": error, "unavailable": True}
+                stale = None
+                if record["type"] == "unreached" or (record["type"] != "result" and record.get("unavailable")):
+                    stale = result_cache.get(keys[username], stale=True)
+                if stale is not None:
+                    record = {"type": "result", "username": username, "data": stale}
+                    cache_info["stale"] += 1
+                    result_cache.count("stale")
+                user_timings = record["data"].pop("timings", None) if record["type"] == "result" else None
+                result_cache.resolve(keys[username], record, store=stale is None and not truncated)
+                records[username] = record if user_timings is None else {**record, "data": {**record["data"], "timings": user_timings}}
+    
+    for username, key in keys.items():
+        if username in records:
+            continue
+        if key in leading:
+            records[username] = {**records[owners[key]], "username": username}
+        elif key in following:
+            flight = following[key]
+            wait_sec = COALESCE_WAIT_SEC
+            if deadline_at is not None:
+                wait_sec = min(wait_sec, max(0, deadline_at - time.time()) + DEADLINE_GRACE_SEC)
+            if flight.done.wait(wait_sec):
+                records[username] = {**flight.record, "username": username}
+            elif deadline_at is not None and time.time() >= deadline_at:
+                records[username] = {"type": "unreached", "username": username}
+            else:
+                records[username] = {"type": "error", "username": username, "error": "Timed out waiting for an identical in-flight scrape"}
     
+    if failure and not cache_info["hits"] and not following and not cache_info["stale"]:
+        return failure
+    
+    ordered = [records[u] for u in keys]
+    unreached = [r["username"] for r in ordered if r["type"] == "unreached"]
+    return {
+        "platform": platform,
+        "success": True,
+        "data": {
+            "results": [r["data"] for r in ordered if r["type"] == "result"],
+            "errors": [{k: v for k, v in r.items() if k != "type"} for r in ordered if r["type"] == "error"],
+            "unreached": unreached,
+            "truncated": truncated or bool(unreached),
+            "cache": cache_info,
+        },
+    }
+
+@timing.timed("handler.scrape_all")
+def run_scrape_all(data, on_update=None, is_cancelled=None):
     github_usernames = data.get('github_usernames', [])
     instagram_urls = data.get('instagram_urls', [])
     xtwitter_urls = data.get('xtwitter_urls', [])
     total_posts = data.get('total_posts', 5)
     trainee_id = data.get('trainee_id', '')
+    use_cache = data.get('cache', True)
+    deadline_at = deadline.from_seconds(data.get('deadline_sec'))
+    timings = bool(data.get('timings', False))
     
     results = {
         "trainee_id": trainee_id,
         "github": [],
         "instagram": [],
         "xtwitter": [],
-        "errors": []
+        "errors": [],
+        "unreached": [],
+        "truncated": False
     }
     
-    tasks = []
-    with ThreadPoolExecutor(max_workers=3) as executor:
-        futures = []
-        
-        if github_usernames:
-            futures.append(executor.submit(call_github_scraper, github_usernames, total_posts))
-        
-        if instagram_urls:
-            futures.append(executor.submit(call_instagram_scraper, instagram_urls, total_posts))
-        
-        if xtwitter_urls:
-            futures.append(executor.submit(call_xtwitter_scraper, xtwitter_urls, total_posts))
-        
-        for future in as_completed(futures):
-            result = future.result()
-            platform = result["platform"]
+    executor = ThreadPoolExecutor(max_workers=3)
+    futures = []
+    
+    if github_usernames:
+        futures.append(executor.submit(profiling.bind(cached_scrape), "github", call_github_scraper, github_usernames, total_posts, use_cache, deadline_at, timings))
+    
+    if instagram_urls:
+        futures.append(executor.submit(profiling.bind(cached_scrape), "instagram", call_instagram_scraper, instagram_urls, total_posts, use_cache, deadline_at, timings))
+    
+    if xtwitter_urls:
+        futures.append(executor.submit(profiling.bind(cached_scrape), "xtwitter", call_xtwitter_scraper, xtwitter_urls, total_posts, use_cache, deadline_at, timings))
+    
+    pending = set(futures)
+    try:
+        while pending:
+            done, pending = wait(pending, timeout=1 if is_cancelled else None, return_when=FIRST_COMPLETED)
             
-            if result["success"]:
-                platform_data = result["data"]
-                results[platform] = platform_data.get("results", [])
+            if is_cancelled and is_cancelled():
+                print(f"🛑 Scrape for trainee {trainee_id} cancelled, dropping remaining platforms.")
+                break
+            
+            for future in done:
+                result = future.result()
+                platform = result["platform"]
                 
-                if "errors" in platform_data:
-                    for err in platform_data["errors"]:
-                        results["errors"].append({
-                            "platform": platform,
-                            **err
-                        })
-            else:
-                results["errors"].append({
-                    "platform": platform,
-                    "error": result["error"]
-                })
+                if result["success"]:
+                    platform_data = result["data"]
+                    results[platform] = platform_data.get("results", [])
+                    
+                    if "errors" in platform_data:
+                        for err in platform_data["errors"]:
+                            results["errors"].append({
+                                "platform": platform,
+                                **err
+                            })
+                    
+                    for username in platform_data.get("unreached", []):
+                        results["unreached"].append({"platform": platform, "username": username})
+                    results["truncated"] = results["truncated"] or bool(platform_data.get("truncated"))
+                    
+                    if timings:
+                        results.setdefault("timings", {})[platform] = timing.aggregate(r.get("timings") for r in results[platform])
+                else:
+                    results["errors"].append({
+                        "platform": platform,
+                        "error": result["error"]
+                    })
+                
+                if on_update:
+                    on_update(build_response(results))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
     
-    response = {
+    return build_response(results)
+
+def build_response(results):
+    return {
         "success": len(results["errors"]) == 0,
-        "trainee_id": trainee_id,
+        "truncated": results["truncated"],
+        "trainee_id": results["trainee_id"],
         "results": results,
         "summary": {
             "github_scraped": len(results["github"]),
             "instagram_scraped": len(results["instagram"]),
             "xtwitter_scraped": len(results["xtwitter"]),
-            "total_errors": len(results["errors"])
+            "total_errors": len(results["errors"]),
+            "total_unreached": len(results["unreached"])
         }
     }
+
+job_queue = JobQueue(JOBS_DB, run_scrape_all, workers=JOB_WORKERS)
+
+def parse_deadline(data):
+    try:
+        return deadline.from_seconds(data.get('deadline_sec')), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'deadline_sec' must be a non-negative number"}), 400)
+
+@app.route('/scrape_all', methods=['POST'])
+def scrape_all():
+    data = request.get_json()
     
-    return jsonify(response)
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    _, error = parse_deadline(data)
+    if error:
+        return error
+    
+    if data.get('async') or request.args.get('mode') == 'job':
+        job_id = job_queue.submit({k: v for k, v in data.items() if k != 'async'})
+        return jsonify({
+            "success": True,
+            "job_id": job_id,
+            "status": "queued",
+            "status_url": f"/jobs/{job_id}"
+        }), 202
+    
+    return jsonify(run_scrape_all(data))
 
-@app.route('/sanity', methods=['GET'])
-def health():
-    services = {
-        "handler": {"status": "ok", "port": 8000},
-        "github": {"status": "unknown", "port": GITHUB_PORT},
-        "instagram": {"status": "unknown", "port": INSTAGRAM_PORT},
-        "xtwitter": {"status": "unknown", "port": XTWITTER_PORT}
-    }
+def stream_platform(platform, payload, records, stop, deadline_at=None):
+    usernames = payload["usernames"]
+    print(f"🔎 Streaming {platform} scraper for {len(usernames)} users...")
+    replicas = replica_sets[platform]
+    breaker = breakers[platform]
+    seen = set()
     
-    for service_name, service_info in list(services.items()):
-        if service_name == "handler":
-            continue
+    def put_unseen(record):
+        for username in usernames:
+            if username not in seen:
+                records.put({**record, "platform": platform, "username": username})
+    
+    if deadline_at is not None and time.time() >= deadline_at:
+        put_unseen({"type": "unreached"})
+        records.put(None)
+        return
+    if not breaker.allow():
+        put_unseen({"type": "error", "error": f"{platform} circuit is open, failing fast", "unavailable": True})
+        records.put(None)
+        return
+    
+    ok = False
+    start = None
+    counted = True
+    try:
+        acquire_timeout = replicas.acquire_timeout if deadline_at is None else max(0, min(replicas.acquire_timeout, deadline_at - time.time()))
+        with replicas.replica(acquire_timeout) as url:
+            limit = breaker.timeout(len(usernames))
+            if deadline_at is not None:
+                payload = {**payload, "deadline_sec": max(0.1, deadline_at - time.time() - DEADLINE_MARGIN_SEC)}
+                limit = min(limit, deadline_at - time.time() + DEADLINE_GRACE_SEC)
+            start = time.time()
+            with requests.post(f"{url}/scrape/stream", json=payload, stream=True, timeout=(5, max(1, limit))) as response:
+                if response.status_code != 200:
+                    records.put({"type": "error", "platform": platform, "error": f"{platform} scraper returned status {response.status_code}"})
+                    return
+                for line in response.iter_lines():
+                    if stop.is_set():
+                        counted = False
+                        return
+                    if line:
+                        record = json.loads(line)
+                        seen.add(record.get("username"))
+                        if record["type"] == "summary" and record.get("truncated"):
+                            counted = False
+                        records.put({**record, "platform": platform})
+                    if time.time() - start > limit:
+                        break
+                else:
+                    ok = True
+                    return
+                if deadline_at is not None and time.time() >= deadline_at:
+                    print(f"⏱️ Deadline reached, closing {platform} stream")
+                    counted = False
+                    put_unseen({"type": "unreached"})
+                else:
+                    print(f"⏱️ {platform} stream exceeded {limit:.0f}s, closing it")
+                    put_unseen({"type": "error", "error": f"{platform} scraper did not finish within {limit:.0f}s", "unavailable": True})
+    except ReplicaUnavailable as e:
+        put_unseen({"type": "unreached"} if deadline_at is not None and time.time() >= deadline_at else {"type": "error", "error": str(e), "unavailable": True})
+    except Exception as e:
+        if deadline_at is not None and time.time() >= deadline_at:
+            counted = False
+            put_unseen({"type": "unreached"})
+        else:
+            records.put({"type": "error", "platform": platform, "error": f"Failed to stream {platform} scraper: {str(e)}"})
+    finally:
+        if start is not None and counted:
+            breaker.record(ok, time.time() - start, len(usernames))
+        else:
+            breaker.cancel()
+        records.put(None)
+
+@app.route('/scrape_all/stream', methods=['POST'])
+def scrape_all_stream():
+    data = request.get_json()
+    
+    if not data:
+        return jsonify({"error": "No data provided"}), 400
+    
+    total_posts = data.get('total_posts', 5)
+    trainee_id = data.get('trainee_id', '')
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
+    
+    jobs = []
+    for platform, key, count_field in (
+        ("github", "github_usernames", "total_repos"),
+        ("instagram", "instagram_urls", "total_posts"),
+        ("xtwitter", "xtwitter_urls", "total_posts"),
+    ):
+        usernames = data.get(key) or []
+        for shard in replica_sets[platform].shards(usernames) if usernames else []:
+            jobs.append((platform, {"usernames": shard, count_field: total_posts, "timings": timings}))
+    
+    def generate():
+        records = queue.Queue()
+        stop = threading.Event()
+        for platform, payload in jobs:
+            threading.Thread(target=profiling.bind(stream_platform), args=(platform, payload, records, stop, deadline_at), daemon=True).start()
         
+        scraped = {"github": 0, "instagram": 0, "xtwitter": 0}
+        total_errors = 0
+        total_unreached = 0
+        remaining = len(jobs)
         try:
-            response = requests.get(f"http://localhost:{service_info['port']}/sanity", timeout=2)
-            if response.status_code == 200:
-                services[service_name]["status"] = "ok"
-            else:
-                services[service_name]["status"] = "error"
-        except Exception as e:
-            services[service_name]["status"] = "offline"
-            services[service_name]["error"] = str(e)
+            while remaining:
+                record = records.get()
+                if record is None:
+                    remaining -= 1
+                    continue
+                if record["type"] == "summary":
+                    continue
+                if record["type"] == "result":
+                    scraped[record["platform"]] += 1
+                elif record["type"] == "unreached":
+                    total_unreached += 1
+                else:
+                    total_errors += 1
+                yield json.dumps({**record, "trainee_id": trainee_id}) + "\n"
+        finally:
+            stop.set()
+        
+        yield json.dumps({
+            "type": "summary",
+            "trainee_id": trainee_id,
+            "success": total_errors == 0,
+            "truncated": total_unreached > 0 or (deadline_at is not None and time.time() >= deadline_at),
+            "summary": {
+                "github_scraped": scraped["github"],
+                "instagram_scraped": scraped["instagram"],
+                "xtwitter_scraped": scraped["xtwitter"],
+                "total_errors": total_errors,
+                "total_unreached": total_unreached
+            }
+        }) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify(job)
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        return jsonify({"error": f"Job {job_id} not found"}), 404
+    return jsonify(job)
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(timing.render_metrics("handler"), mimetype="text/plain; version=0.0.4")
+
+@app.route('/sanity', methods=['GET'])
+def health():
+    health_checker.start()
+    checked = health_checker.status()
+    services = {"handler": {"status": "ok", "ready": True, "port": 8000}}
+    for platform, replicas in replica_sets.items():
+        service = dict(checked["services"][platform])
+        load = {replica["url"]: replica for replica in replicas.stats()}
+        service["replicas"] = [{**replica, **load.get(replica["url"], {})} for replica in service["replicas"]]
+        services[platform] = service
     
     all_ok = all(s["status"] == "ok" for s in services.values())
     
     return jsonify({
         "status": "ok" if all_ok else "degraded",
         "service": "Social Hook Handler",
-        "services": services
+        "services": services,
+        "checked_at": checked["checked_at"],
+        "age_sec": checked["age_sec"],
+        "result_cache": checked["result_cache"],
+        "circuits": {platform: breaker.stats() for platform, breaker in breakers.items()}
     })
 
 if __name__ == "__main__":
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        job_queue.start()
+        health_checker.start()
     app.run(debug=True, host="0.0.0.0", port=8000)
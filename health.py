@@ -0,0 +1,102 @@
+import time
+import threading
+import requests
+from concurrent.futures import ThreadPoolExecutor
+
+
+def readiness(body):
+    browsers = body.get("browsers") or {}
+    workers = body.get("workers") or {}
+    details = {"ready": body.get("ready", body.get("status") == "ok")}
+    if browsers:
+        details["warm_browsers"] = browsers.get("idle")
+        details["warm_up"] = browsers.get("warm_up")
+    if workers:
+        details["workers_alive"] = workers.get("alive")
+    return details
+
+
+def probe(url, timeout):
+    start = time.time()
+    try:
+        response = requests.get(f"{url}/sanity", timeout=timeout)
+        latency_ms = round((time.time() - start) * 1000, 1)
+        if response.status_code != 200:
+            return {"status": "error", "latency_ms": latency_ms, "ready": False, "error": f"status {response.status_code}"}
+        return {"status": "ok", "latency_ms": latency_ms, **readiness(response.json())}
+    except Exception as e:
+        return {"status": "offline", "latency_ms": round((time.time() - start) * 1000, 1), "ready": False, "error": str(e)}
+
+
+def service_status(replicas):
+    statuses = {replica["status"] for replica in replicas}
+    if statuses == {"ok"}:
+        return "ok"
+    if "ok" in statuses:
+        return "degraded"
+    if "unknown" in statuses:
+        return "unknown"
+    return "offline" if "offline" in statuses else "error"
+
+
+class HealthChecker:
+    def __init__(self, services, interval_sec=5, timeout_sec=2, collectors=None):
+        self.services = services
+        self.interval_sec = interval_sec
+        self.timeout_sec = timeout_sec
+        self.collectors = collectors or {}
+        self.checked_at = None
+        self.snapshot = {
+            "services": {
+                name: {"status": "unknown", "ready": False, "replicas": [{"url": url, "status": "unknown"} for url in urls]}
+                for name, urls in services.items()
+            },
+            **{name: None for name in self.collectors},
+        }
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._run, name="health-checker", daemon=True)
+            self._thread.start()
+        print(f"🩺 Health checker started, probing every {self.interval_sec}s")
+
+    def _run(self):
+        targets = [(name, url) for name, urls in self.services.items() for url in urls]
+        with ThreadPoolExecutor(max_workers=max(1, len(targets)), thread_name_prefix="health-probe") as executor:
+            while True:
+                started = time.time()
+                try:
+                    self.refresh(executor, targets)
+                except Exception as e:
+                    print(f"⚠️ Health check failed: {e}")
+                time.sleep(max(0, self.interval_sec - (time.time() - started)))
+
+    def refresh(self, executor, targets):
+        probes = list(executor.map(lambda target: probe(target[1], self.timeout_sec), targets))
+        services = {}
+        for (name, url), result in zip(targets, probes):
+            services.setdefault(name, {"replicas": []})["replicas"].append({"url": url, **result})
+        for service in services.values():
+            service["status"] = service_status(service["replicas"])
+            service["ready"] = any(replica.get("ready") for replica in service["replicas"])
+
+        snapshot = {"services": services}
+        for name, collect in self.collectors.items():
+            try:
+                snapshot[name] = collect()
+            except Exception as e:
+                snapshot[name] = {"error": str(e)}
+
+        self.snapshot = snapshot
+        self.checked_at = time.time()
+
+    def status(self):
+        return {
+            **self.snapshot,
+            "checked_at": self.checked_at,
+            "age_sec": round(time.time() - self.checked_at, 2) if self.checked_at else None,
+        }
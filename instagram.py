@@ -1,37 +1,65 @@
 import os
 import time
 import json
+import threading
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-
-
+from browser import LEAN_DRIVER, build_chrome_options, chrome_service, chromedriver_path, block_resources, network_capture
+from driver_pool import DriverPool
+from tabs import TabScheduler
+from worker_pool import WorkerPool
+from page_parser import PAGE_PARSER
+import page_parser
+from selector_registry import registry as selectors
+import waits
+import deadline
+import timing
+import profiling
+
+
+HOME_URL = "https://www.instagram.com/"
 COOKIES_FILE = "credentials/instagram_cookies.json"
 WAIT_SEC = 1
 TOTAL_POSTS_TO_SCRAPE = 5
-
-
-def setup_driver():
+DRIVER_POOL_SIZE = int(os.getenv("INSTAGRAM_DRIVER_POOL_SIZE", 2))
+DRIVER_MAX_PAGES = int(os.getenv("INSTAGRAM_DRIVER_MAX_PAGES", 200))
+STEP_TIMEOUT = float(os.getenv("INSTAGRAM_STEP_TIMEOUT", 5))
+INSTAGRAM_BACKEND = os.getenv("INSTAGRAM_BACKEND", "network")
+MAX_SCROLL_STALLS = int(os.getenv("INSTAGRAM_MAX_SCROLL_STALLS", 3))
+MAX_CAROUSEL_SLIDES = int(os.getenv("INSTAGRAM_MAX_CAROUSEL_SLIDES", 20))
+TABS_PER_BROWSER = int(os.getenv("INSTAGRAM_TABS_PER_BROWSER", 3))
+MAX_TABS_PER_BROWSER = int(os.getenv("INSTAGRAM_MAX_TABS_PER_BROWSER", 8))
+WORKER_PROCESSES = int(os.getenv("INSTAGRAM_WORKER_PROCESSES", 0))
+WORKER_MAX_TASKS = int(os.getenv("INSTAGRAM_WORKER_MAX_TASKS", 50))
+WARM_BROWSERS = int(os.getenv("INSTAGRAM_WARM_BROWSERS", DRIVER_POOL_SIZE))
+INSTAGRAM_API_PATHS = ("/api/v1/users/web_profile_info", "/api/v1/feed/user/", "/graphql/query", "/api/graphql")
+
+
+@timing.timed("instagram.chrome_launch")
+def setup_driver(lean=LEAN_DRIVER, user_data_dir=None):
     os.makedirs(os.path.dirname(COOKIES_FILE), exist_ok=True)
 
-    options = webdriver.ChromeOptions()
+    options = build_chrome_options(lean, capture_network=True, user_data_dir=user_data_dir)
 
-    service = Service(ChromeDriverManager().install())
+    service = chrome_service()
     driver = webdriver.Chrome(service=service, options=options)
     wait = WebDriverWait(driver, WAIT_SEC)
-    driver.maximize_window()
+    if lean:
+        block_resources(driver)
+    else:
+        driver.maximize_window()
 
     return driver, wait
 
 
+@timing.timed("instagram.login")
 def login_with_cookies(driver, login_wait_sec):
-    driver.get("https://www.instagram.com/")
-    time.sleep(WAIT_SEC)
+    driver.get(HOME_URL)
+    waits.document_ready(driver, "instagram.home", STEP_TIMEOUT)
 
     if os.path.exists(COOKIES_FILE):
         with open(COOKIES_FILE, "r", encoding="utf-8") as f:
@@ -43,7 +71,7 @@ def login_with_cookies(driver, login_wait_sec):
                     c["domain"] = ".instagram.com"
                     driver.add_cookie(c)
         driver.refresh()
-        time.sleep(WAIT_SEC)
+        waits.page_ready(driver, "instagram.login_refresh", STEP_TIMEOUT)
         print("Logged in with cookies.")
         return
     else:
@@ -54,24 +82,31 @@ def login_with_cookies(driver, login_wait_sec):
         print("Cookies saved.")
         return
 
-def scrape_biodata(driver, wait, profile_username):
-    driver.get(profile_username)
+@timing.timed("instagram.biodata")
+def scrape_biodata(driver, wait, profile_username, navigate=True):
+    if navigate:
+        driver.get(profile_username)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "header")))
-    time.sleep(WAIT_SEC)
+    waits.dom_quiet(driver, "instagram.profile", STEP_TIMEOUT)
+
+    if PAGE_PARSER == "lxml":
+        biodata = page_parser.instagram_profile(driver.page_source, profile_username)
+        print(f"  📝 Bio: {biodata['user']['bio'][:60]}...")
+        return biodata
 
     username = profile_username.rstrip("/").split("/")[-1]
     bio = ""
     profile_image = ""
 
     try:
-        img = driver.find_element(By.CSS_SELECTOR, "img.xpdipgo.x972fbf.x10w94by.x1qhh985.x14e42zd.xk390pu.x5yr21d.xdj266r.x14z9mp.xat24cr.x1lziwak.xl1xv1r.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x11njtxf.xh8yej3")
+        img = selectors.find(driver, "instagram.profile_image")
         profile_image = img.get_attribute("src")
         print(f"  🖼️ Profile image: {profile_image[:60]}...")
     except Exception as e:
         print(f"⚠️ Error scraping profile image for {profile_username}: {e}")
 
     try:
-        bio_spans = driver.find_elements(By.CSS_SELECTOR, "span._ap3a._aaco._aacu._aacx._aad7._aade")
+        bio_spans = selectors.find_all(driver, "instagram.bio")
         if bio_spans:
             last_span = bio_spans[-1]
             bio = last_span.text.strip().replace("\n", " ")
@@ -88,44 +123,53 @@ def scrape_biodata(driver, wait, profile_username):
     }
 
 
+def current_carousel_src(driver):
+    ul_elements = selectors.find_all(driver, "instagram.carousel_list")
+    if not ul_elements:
+        return None
+    first_li = selectors.find(ul_elements[-1], "instagram.carousel_item")
+    img = selectors.find(first_li, "instagram.post_image") if first_li else None
+    return img.get_attribute("src") if img else None
+
+
 def get_post_images(driver, wait):
     images = []
     
     try:
-        video_elements = driver.find_elements(By.CSS_SELECTOR, "video.x1lliihq.x5yr21d.xh8yej3")
+        video_elements = selectors.find_all(driver, "instagram.video")
         if video_elements:
             src = video_elements[0].get_attribute("src")
             images.append(src)
             print(f"    🎥 Video found: {src[:60]}...")
             return images
         
-        next_img_button = driver.find_elements(By.CSS_SELECTOR, "button._afxw._al46._al47")
+        next_img_button = selectors.find_all(driver, "instagram.carousel_next")
         
         if next_img_button:
             print("    📸 Multiple images detected")
-            while True:
+            for _ in range(MAX_CAROUSEL_SLIDES):
+                if deadline.expired():
+                    break
                 try:
-                    ul_elements = driver.find_elements(By.CSS_SELECTOR, "ul._acay")
-                    if ul_elements:
-                        last_ul = ul_elements[-1]
-                        first_li = last_ul.find_element(By.CSS_SELECTOR, "li._acaz")
-                        img = first_li.find_element(By.CSS_SELECTOR, "img.x5yr21d.xu96u03.x10l6tqk.x13vifvy.x87ps6o.xh8yej3")
-                        src = img.get_attribute("src")
+                    src = current_carousel_src(driver)
+                    if src:
                         images.append(src)
                         print(f"    📷 Image {len(images)}: {src[:60]}...")
                     
-                    next_btn = driver.find_elements(By.CSS_SELECTOR, "button._afxw._al46._al47")
+                    next_btn = selectors.find_all(driver, "instagram.carousel_next")
                     if not next_btn:
                         break
                     driver.execute_script("arguments[0].click();", next_btn[0])
-                    time.sleep(WAIT_SEC)
+                    if not waits.until(driver, "instagram.carousel_next", lambda d: current_carousel_src(d) != src, STEP_TIMEOUT):
+                        print("    ⚠️ Carousel did not advance, stopping.")
+                        break
                 except Exception as e:
                     print(f"    ⚠️ End of carousel or error: {e}")
                     break
         else:
             try:
-                div_container = driver.find_element(By.CSS_SELECTOR, "div._aagu._aato")
-                img = div_container.find_element(By.CSS_SELECTOR, "img.x5yr21d.xu96u03.x10l6tqk.x13vifvy.x87ps6o.xh8yej3")
+                div_container = selectors.find(driver, "instagram.single_image_container")
+                img = selectors.find(div_container, "instagram.post_image")
                 src = img.get_attribute("src")
                 images.append(src)
                 print(f"    📷 Single image: {src[:60]}...")
@@ -138,6 +182,7 @@ def get_post_images(driver, wait):
     return images
 
 
+@timing.timed("instagram.posts")
 def scrape_posts(driver, wait, total_posts=None):
     if total_posts is None:
         total_posts = TOTAL_POSTS_TO_SCRAPE
@@ -146,21 +191,21 @@ def scrape_posts(driver, wait, total_posts=None):
     
     try:
         first_post = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "div._aagw")))
+        profile_url = driver.current_url
         driver.execute_script("arguments[0].click();", first_post)
-        time.sleep(WAIT_SEC)
+        waits.url_changes(driver, "instagram.open_post", profile_url, STEP_TIMEOUT)
 
         scraped = 0
         clicked_next = False
 
         while scraped < total_posts:
+            if deadline.expired():
+                print("⏱️ Deadline reached, returning posts scraped so far.")
+                break
             post_data = {"caption": "", "images": []}
             
             try:
-                caption_el = wait.until(
-                    EC.presence_of_element_located(
-                        (By.CSS_SELECTOR, "h1._ap3a._aaco._aacu._aacx._aad7._aade")
-                    )
-                )
+                caption_el = selectors.wait_for(driver, "instagram.caption", WAIT_SEC)[0]
                 caption = caption_el.text.strip().replace("\n", " ")
                 post_data["caption"] = caption
                 print(f"  📝 Post {scraped + 1} caption: {caption[:60]}...")
@@ -173,7 +218,8 @@ def scrape_posts(driver, wait, total_posts=None):
             posts.append(post_data)
             scraped += 1
 
-            nav_buttons = driver.find_elements(By.CSS_SELECTOR, "button._abl-")
+            nav_buttons = selectors.find_all(driver, "instagram.post_nav")
+            post_url = driver.current_url
 
             if len(nav_buttons) == 1:
                 print("ℹ️ Only one post found, stopping.")
@@ -182,14 +228,14 @@ def scrape_posts(driver, wait, total_posts=None):
                 if not clicked_next:
                     driver.execute_script("arguments[0].click();", nav_buttons[0])
                     clicked_next = True
-                    time.sleep(WAIT_SEC)
+                    waits.url_changes(driver, "instagram.next_post", post_url, STEP_TIMEOUT)
                 else:
                     print("ℹ️ Reached last post, stopping.")
                     break
             elif len(nav_buttons) == 3:
                 driver.execute_script("arguments[0].click();", nav_buttons[1])
                 clicked_next = True
-                time.sleep(WAIT_SEC)
+                waits.url_changes(driver, "instagram.next_post", post_url, STEP_TIMEOUT)
             else:
                 print("⚠️ Unexpected button state, stopping.")
                 break
@@ -199,74 +245,423 @@ def scrape_posts(driver, wait, total_posts=None):
 
     return posts
 
-app = Flask(__name__)
 
-driver = None
-wait = None
+CLICK_CAROUSEL_NEXT_JS = """
+for (const selector of arguments[0]) {
+    const next = document.querySelector(selector);
+    if (next) {
+        next.click();
+        return true;
+    }
+}
+return false;
+"""
+
+CLICK_POST_NAV_JS = """
+for (const selector of arguments[0]) {
+    const buttons = document.querySelectorAll(selector);
+    if (!buttons.length) continue;
+    if (buttons.length <= arguments[1]) return false;
+    buttons[arguments[1]].click();
+    return true;
+}
+return false;
+"""
+
+
+def get_post_images_html(driver, post):
+    images = list(post["images"])
+    if not post["has_next_image"]:
+        return images
+
+    print("    📸 Multiple images detected")
+    for _ in range(MAX_CAROUSEL_SLIDES):
+        if deadline.expired() or not driver.execute_script(CLICK_CAROUSEL_NEXT_JS, selectors.css("instagram.carousel_next")):
+            break
+        waits.dom_quiet(driver, "instagram.carousel_next", STEP_TIMEOUT)
+        slide = page_parser.instagram_post(driver.page_source)
+        new_images = [src for src in slide["images"] if src not in images]
+        if not new_images:
+            break
+        images.extend(new_images)
+    return images
+
+
+@timing.timed("instagram.posts")
+def scrape_posts_html(driver, wait, total_posts=None):
+    if total_posts is None:
+        total_posts = TOTAL_POSTS_TO_SCRAPE
+
+    posts = []
+
+    try:
+        first_post = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "div._aagw")))
+        profile_url = driver.current_url
+        driver.execute_script("arguments[0].click();", first_post)
+        waits.url_changes(driver, "instagram.open_post", profile_url, STEP_TIMEOUT)
+
+        clicked_next = False
+
+        while len(posts) < total_posts:
+            if deadline.expired():
+                print("⏱️ Deadline reached, returning posts scraped so far.")
+                break
+            waits.dom_quiet(driver, "instagram.post", STEP_TIMEOUT)
+            post = page_parser.instagram_post(driver.page_source)
+            images = get_post_images_html(driver, post)
+            posts.append({"caption": post["caption"], "images": images})
+            print(f"  📝 Post {len(posts)} caption: {post['caption'][:60]}... ({len(images)} media)")
+
+            post_url = driver.current_url
+            nav_buttons = post["nav_buttons"]
+
+            if nav_buttons == 1:
+                print("ℹ️ Only one post found, stopping.")
+                break
+            elif nav_buttons == 2 and clicked_next:
+                print("ℹ️ Reached last post, stopping.")
+                break
+            elif nav_buttons in (2, 3):
+                driver.execute_script(CLICK_POST_NAV_JS, selectors.css("instagram.post_nav"), nav_buttons - 2)
+                clicked_next = True
+                waits.url_changes(driver, "instagram.next_post", post_url, STEP_TIMEOUT)
+            else:
+                print("⚠️ Unexpected button state, stopping.")
+                break
+
+    except Exception as e:
+        print(f"⚠️ Error scraping posts: {e}")
+
+    return posts
+
+
+def is_instagram_api(url):
+    return "instagram.com" in url and any(path in url for path in INSTAGRAM_API_PATHS)
+
+
+def best_image_url(node):
+    candidates = (node.get("image_versions2") or {}).get("candidates") or []
+    if candidates:
+        return candidates[0].get("url")
+    return node.get("display_url")
+
+
+def media_urls(node):
+    if node.get("video_versions"):
+        return [node["video_versions"][0].get("url")]
+    if node.get("is_video") and node.get("video_url"):
+        return [node["video_url"]]
+    url = best_image_url(node)
+    return [url] if url else []
+
+
+def media_node_to_post(node):
+    caption = ""
+    if isinstance(node.get("caption"), dict):
+        caption = node["caption"].get("text") or ""
+    else:
+        caption_edges = (node.get("edge_media_to_caption") or {}).get("edges") or []
+        if caption_edges:
+            caption = caption_edges[0]["node"].get("text") or ""
+
+    children = node.get("carousel_media")
+    if children is None:
+        children = [e["node"] for e in ((node.get("edge_sidecar_to_children") or {}).get("edges") or [])]
+
+    images = []
+    for child in children or [node]:
+        images.extend(media_urls(child))
+
+    return {
+        "id": node.get("code") or node.get("shortcode") or node.get("id") or node.get("pk"),
+        "caption": caption.strip().replace("\n", " "),
+        "images": images,
+    }
 
-def initialize_driver(login_wait_sec):
-    global driver, wait
-    if driver is None:
-        driver, wait = setup_driver()
-        login_with_cookies(driver, login_wait_sec)
+
+def parse_profile_payload(payload):
+    user = ((payload or {}).get("data") or {}).get("user")
+    if not user or "biography" not in user:
+        return None, []
+
+    profile = {
+        "username": user.get("username"),
+        "bio": (user.get("biography") or "").strip().replace("\n", " "),
+        "profile_image": user.get("profile_pic_url_hd") or user.get("profile_pic_url") or "",
+    }
+    edges = (user.get("edge_owner_to_timeline_media") or {}).get("edges") or []
+    return profile, [media_node_to_post(e["node"]) for e in edges]
+
+
+def parse_timeline_payload(payload):
+    if not isinstance(payload, dict):
+        return []
+    if isinstance(payload.get("items"), list):
+        return [media_node_to_post(item) for item in payload["items"]]
+
+    data = payload.get("data") or {}
+    for key, value in data.items():
+        if "timeline" in key and isinstance(value, dict) and "edges" in value:
+            return [media_node_to_post(e["node"]) for e in value["edges"]]
+    return []
+
+
+@timing.timed("instagram.network_profile")
+def scrape_profile_network(driver, wait, profile_url, total_posts=None, navigate=True):
+    if total_posts is None:
+        total_posts = TOTAL_POSTS_TO_SCRAPE
+
+    capture = network_capture(driver)
+    if navigate:
+        capture.clear()
+        driver.get(profile_url)
+
+    username = profile_url.rstrip("/").split("/")[-1]
+    state = {"user": None, "posts": [], "seen": set()}
+
+    def absorb():
+        for _, payload in capture.poll(is_instagram_api):
+            profile, posts = parse_profile_payload(payload)
+            if profile and (profile["username"] or "").lower() == username.lower():
+                state["user"] = profile
+            for post in posts + parse_timeline_payload(payload):
+                key = post["id"] or post["caption"]
+                if key in state["seen"]:
+                    continue
+                state["seen"].add(key)
+                state["posts"].append(post)
+
+    def profile_loaded(_):
+        absorb()
+        return state["user"] is not None
+
+    waits.until(driver, "instagram.network_profile", profile_loaded, STEP_TIMEOUT)
+    if state["user"] is None:
+        print(f"⚠️ No profile payload captured for {profile_url}, falling back to DOM scraping")
+        return None
+
+    print(f"  📝 Bio: {state['user']['bio'][:60]}...")
+    stalls = 0
+    while len(state["posts"]) < total_posts and stalls < MAX_SCROLL_STALLS and not deadline.expired():
+        before = len(state["posts"])
+
+        def posts_grew(_):
+            absorb()
+            return len(state["posts"]) > before
+
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        stalls = 0 if waits.until(driver, "instagram.network_scroll", posts_grew, STEP_TIMEOUT) else stalls + 1
+
+    posts = [{"caption": p["caption"], "images": p["images"]} for p in state["posts"][:total_posts]]
+    for i, post in enumerate(posts):
+        print(f"  📝 Post {i + 1} caption: {post['caption'][:60]}...")
+    return {"user": state["user"], "posts": posts}
+
+
+app = Flask(__name__)
+profiling.install(app, "instagram")
+
+def create_logged_in_driver():
+    driver, wait = setup_driver()
+    try:
+        login_with_cookies(driver, 0)
+    except Exception:
+        driver.quit()
+        raise
     return driver, wait
 
+
+driver_pool = DriverPool(create_logged_in_driver, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES)
+
+def scrape_profile(driver, wait, profile_url, total_posts, backend=None, navigate=True):
+    if backend is None:
+        backend = INSTAGRAM_BACKEND
+
+    if backend == "network":
+        user_data = scrape_profile_network(driver, wait, profile_url, total_posts=total_posts, navigate=navigate)
+        if user_data is not None:
+            return user_data, 1
+    else:
+        network_capture(driver).clear()
+
+    biodata = scrape_biodata(driver, wait, profile_url, navigate=navigate)
+    if PAGE_PARSER == "lxml":
+        posts = scrape_posts_html(driver, wait, total_posts=total_posts)
+    else:
+        posts = scrape_posts(driver, wait, total_posts=total_posts)
+    return {**biodata, "posts": posts}, 1 + len(posts)
+
+def profile_url_for(username):
+    return f"https://www.instagram.com/{username.strip('/')}/" if not username.startswith('http') else username
+
+def iter_scrape_local(usernames, total_posts, backend=None, tabs=None, deadline_at=None, timings=False):
+    if tabs is None:
+        tabs = TABS_PER_BROWSER
+
+    with deadline.scope(deadline_at), driver_pool.session() as session:
+        def scrape_one(username, navigate):
+            print(f"🔎 Scraping Instagram user: {username}")
+            with timing.collect(timings) as user_timings:
+                with timing.span("instagram.profile"):
+                    user_data, pages = scrape_profile(session.driver, session.wait, profile_url_for(username), total_posts, backend, navigate)
+            session.mark_page(pages)
+            if user_timings is not None:
+                user_data["timings"] = timing.rounded(user_timings)
+            return user_data
+
+        scheduler = TabScheduler(session.driver, min(tabs, len(usernames)) or 1, load_timeout=STEP_TIMEOUT * 3)
+        for username, user_data, error in scheduler.run(usernames, profile_url_for, scrape_one, stop=deadline.expired):
+            if error is None:
+                yield {"type": "result", "username": username, "data": user_data}
+            elif isinstance(error, deadline.DeadlineExceeded):
+                yield {"type": "unreached", "username": username}
+            else:
+                yield {"type": "error", "username": username, "error": str(error)}
+
+worker_pool = WorkerPool("instagram", WORKER_PROCESSES, max_tasks=WORKER_MAX_TASKS) if WORKER_PROCESSES > 0 else None
+
+def iter_scrape(usernames, total_posts, backend=None, tabs=None, deadline_at=None, timings=False):
+    if worker_pool is None:
+        yield from iter_scrape_local(usernames, total_posts, backend, tabs, deadline_at, timings)
+        return
+    yield from worker_pool.scrape(usernames, total_posts=total_posts, backend=backend, tabs=tabs, deadline_at=deadline_at, timings=timings)
+
+def warm_up():
+    if worker_pool is not None:
+        worker_pool.start()
+        return
+    if WARM_BROWSERS > 0:
+        driver_pool.start_warm_up(WARM_BROWSERS)
+    else:
+        threading.Thread(target=chromedriver_path, name="chromedriver-lookup", daemon=True).start()
+
+def is_ready():
+    if worker_pool is not None:
+        return worker_pool.stats()["alive"] > 0
+    return driver_pool.stats()["idle"] > 0 or driver_pool.warm_state in ("ready", "degraded")
+
+def parse_scrape_request(data):
+    if not data or 'usernames' not in data:
+        return None, (jsonify({"error": "Please provide 'usernames' in request body"}), 400)
+    
+    if not isinstance(data['usernames'], list):
+        return None, (jsonify({"error": "'usernames' must be a list"}), 400)
+    
+    return data['usernames'], None
+
+def parse_deadline(data):
+    try:
+        return deadline.from_seconds(data.get('deadline_sec')), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'deadline_sec' must be a non-negative number"}), 400)
+
+def parse_tabs(data):
+    try:
+        return max(1, min(int(data.get('tabs', TABS_PER_BROWSER)), MAX_TABS_PER_BROWSER)), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'tabs' must be an integer"}), 400)
+
 @app.route('/scrape', methods=['POST'])
 def scrape():
-    global driver, wait
     data = request.get_json()
-    total_posts = data.get('total_posts', 5) if data else 5
-
-    if not data or 'usernames' not in data:
-        return jsonify({"error": "Please provide 'usernames' in request body"}), 400
+    usernames, error = parse_scrape_request(data)
+    if error:
+        return error
     
-    usernames = data['usernames']
-    if not isinstance(usernames, list):
-        return jsonify({"error": "'usernames' must be a list"}), 400
+    total_posts = data.get('total_posts', 5)
+    backend = data.get('backend', INSTAGRAM_BACKEND)
+    tabs, error = parse_tabs(data)
+    if error:
+        return error
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
     
     try:
-        driver, wait = initialize_driver(0)
-        
         results = []
         errors = []
+        unreached = []
         
-        for username in usernames:
-            try:
-                profile_url = f"https://www.instagram.com/{username.strip('/')}/" if not username.startswith('http') else username
-                print(f"🔎 Scraping Instagram user: {username}")
-                
-                biodata = scrape_biodata(driver, wait, profile_url)
-                posts = scrape_posts(driver, wait, total_posts=total_posts)
-                user_data = {**biodata, "posts": posts}
-                results.append(user_data)
-                
-            except Exception as e:
-                errors.append({"username": username, "error": str(e)})
+        order = {username: i for i, username in enumerate(usernames)}
+        records = sorted(iter_scrape(usernames, total_posts, backend, tabs, deadline_at, timings), key=lambda r: order.get(r["username"], len(usernames)))
+        for record in records:
+            if record["type"] == "result":
+                results.append(record["data"])
+            elif record["type"] == "unreached":
+                unreached.append(record["username"])
+            else:
+                errors.append({"username": record["username"], "error": record["error"]})
         
         response = {
             "success": True,
             "scraped": len(results),
             "results": results,
+            "truncated": bool(unreached) or (deadline_at is not None and time.time() >= deadline_at),
+            "unreached": unreached,
         }
         
         if errors:
             response["errors"] = errors
             response["success"] = False
         
-        driver.quit()
-        driver = None
-        wait = None
         return jsonify(response)
     except Exception as e:
-        if driver:
-            driver.quit()
-            driver = None
-            wait = None
         return jsonify({"error": str(e), "success": False}), 500
 
+@app.route('/scrape/stream', methods=['POST'])
+def scrape_stream():
+    data = request.get_json()
+    usernames, error = parse_scrape_request(data)
+    if error:
+        return error
+    
+    total_posts = data.get('total_posts', 5)
+    backend = data.get('backend', INSTAGRAM_BACKEND)
+    tabs, error = parse_tabs(data)
+    if error:
+        return error
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
+
+    def generate():
+        scraped = 0
+        errors = 0
+        unreached = []
+        try:
+            for record in iter_scrape(usernames, total_posts, backend, tabs, deadline_at, timings):
+                if record["type"] == "result":
+                    scraped += 1
+                elif record["type"] == "unreached":
+                    unreached.append(record["username"])
+                else:
+                    errors += 1
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            errors += 1
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        truncated = bool(unreached) or (deadline_at is not None and time.time() >= deadline_at)
+        yield json.dumps({"type": "summary", "scraped": scraped, "errors": errors, "truncated": truncated, "unreached": unreached, "success": errors == 0}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route('/sanity', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "service": "Instagram Scraper"})
+    return jsonify({"status": "ok", "service": "Instagram Scraper", "ready": is_ready(), "browsers": driver_pool.stats(), "workers": worker_pool.stats() if worker_pool else None})
+
+@app.route('/waits', methods=['GET'])
+def wait_stats():
+    return jsonify({"service": "Instagram Scraper", "waits": waits.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(timing.render_metrics("instagram"), mimetype="text/plain; version=0.0.4")
+
+@app.route('/selectors', methods=['GET'])
+def selector_stats():
+    return jsonify({"service": "Instagram Scraper", "selectors": selectors.stats()})
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -275,7 +670,7 @@ def login():
     login_wait_sec = data.get('wait_sec', 30) if data else 30
     
     try:
-        temp_driver, temp_wait = setup_driver()
+        temp_driver, temp_wait = setup_driver(lean=False)
         login_with_cookies(temp_driver, login_wait_sec)
         
         return jsonify({"success": True, "message": "Login completed and browser closed"})
@@ -287,4 +682,6 @@ def login():
         temp_driver.quit()
 
 if __name__ == "__main__":
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
     app.run(debug=True, host="0.0.0.0", port=5001)
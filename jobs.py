@@ -0,0 +1,189 @@
+import os
+import json
+import time
+import uuid
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class JobQueue:
+    def __init__(self, db_path, runner, workers=4, poll_sec=1.0):
+        self.db_path = db_path
+        self.runner = runner
+        self.workers = max(1, workers)
+        self.poll_sec = poll_sec
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    cancel_requested INTEGER NOT NULL DEFAULT 0,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    updated_at REAL NOT NULL,
+                    finished_at REAL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def start(self):
+        with self._lock:
+            if self._threads:
+                return
+            self._requeue_interrupted()
+            for i in range(self.workers):
+                t = threading.Thread(target=self._work, name=f"job-worker-{i}", daemon=True)
+                t.start()
+                self._threads.append(t)
+        print(f"🧵 Job queue started with {self.workers} workers ({self.db_path})")
+
+    def _requeue_interrupted(self):
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, updated_at = ? WHERE status = 'running'",
+                (time.time(),),
+            )
+            if cur.rowcount:
+                print(f"ℹ️ Re-queued {cur.rowcount} interrupted jobs.")
+
+    def submit(self, payload):
+        self.start()
+        job_id = uuid.uuid4().hex
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, status, payload, created_at, updated_at) VALUES (?, 'queued', ?, ?, ?)",
+                (job_id, json.dumps(payload), now, now),
+            )
+        self._wakeup.set()
+        return job_id
+
+    def get(self, job_id):
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None:
+                return None
+            position = None
+            if row["status"] == "queued":
+                position = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'queued' AND created_at < ?",
+                    (row["created_at"],),
+                ).fetchone()[0]
+
+        job = {
+            "job_id": row["id"],
+            "status": row["status"],
+            "cancel_requested": bool(row["cancel_requested"]),
+            "created_at": row["created_at"],
+            "started_at": row["started_at"],
+            "finished_at": row["finished_at"],
+            "result": json.loads(row["result"]) if row["result"] else None,
+        }
+        if position is not None:
+            job["queue_position"] = position
+        if row["error"]:
+            job["error"] = row["error"]
+        return job
+
+    def cancel(self, job_id):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'cancelled', cancel_requested = 1, updated_at = ?, finished_at = ? "
+                "WHERE id = ? AND status = 'queued'",
+                (now, now, job_id),
+            )
+            conn.execute(
+                "UPDATE jobs SET cancel_requested = 1, updated_at = ? WHERE id = ? AND status = 'running'",
+                (now, job_id),
+            )
+        return self.get(job_id)
+
+    def _claim(self):
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, payload FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                now = time.time()
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', started_at = ?, updated_at = ? WHERE id = ?",
+                    (now, now, row[0]),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return row[0], json.loads(row[1])
+
+    def _is_cancelled(self, job_id):
+        with self._connect() as conn:
+            row = conn.execute("SELECT cancel_requested FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return bool(row and row[0])
+
+    def _save_partial(self, job_id, result):
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET result = ?, updated_at = ? WHERE id = ? AND status = 'running'",
+                (json.dumps(result), time.time(), job_id),
+            )
+
+    def _finish(self, job_id, status, result=None, error=None):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = ?, result = COALESCE(?, result), error = ?, updated_at = ?, finished_at = ? "
+                "WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, now, now, job_id),
+            )
+
+    def _work(self):
+        while True:
+            try:
+                claimed = self._claim()
+            except Exception as e:
+                print(f"⚠️ Job queue error while claiming a job: {e}")
+                claimed = None
+
+            if claimed is None:
+                self._wakeup.wait(self.poll_sec)
+                self._wakeup.clear()
+                continue
+
+            job_id, payload = claimed
+            print(f"🚚 Running job {job_id}")
+            try:
+                result = self.runner(
+                    payload,
+                    on_update=lambda partial: self._save_partial(job_id, partial),
+                    is_cancelled=lambda: self._is_cancelled(job_id),
+                )
+                status = "cancelled" if self._is_cancelled(job_id) else "completed"
+                self._finish(job_id, status, result=result)
+            except Exception as e:
+                print(f"⚠️ Job {job_id} failed: {e}")
+                self._finish(job_id, "failed", error=str(e))
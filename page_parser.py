@@ -0,0 +1,189 @@
+import os
+import re
+from lxml import html as lxml_html
+from selenium.webdriver.common.by import By
+from selector_registry import registry
+
+
+PAGE_PARSER = os.getenv("PAGE_PARSER", "lxml")
+
+INSTAGRAM_PROFILE_IMAGE = "img.xpdipgo.x972fbf.x10w94by.x1qhh985.x14e42zd.xk390pu.x5yr21d.xdj266r.x14z9mp.xat24cr.x1lziwak.xl1xv1r.xexx8yu.xyri2b.x18d9i69.x1c1uobl.x11njtxf.xh8yej3"
+INSTAGRAM_BIO = "span._ap3a._aaco._aacu._aacx._aad7._aade"
+INSTAGRAM_CAPTION = "h1._ap3a._aaco._aacu._aacx._aad7._aade"
+INSTAGRAM_VIDEO = "video.x1lliihq.x5yr21d.xh8yej3"
+INSTAGRAM_CAROUSEL_NEXT = "button._afxw._al46._al47"
+INSTAGRAM_CAROUSEL_LIST = "ul._acay"
+INSTAGRAM_CAROUSEL_ITEM = "li._acaz"
+INSTAGRAM_SINGLE_IMAGE_CONTAINER = "div._aagu._aato"
+INSTAGRAM_POST_IMAGE = "img.x5yr21d.xu96u03.x10l6tqk.x13vifvy.x87ps6o.xh8yej3"
+INSTAGRAM_POST_NAV = "button._abl-"
+
+TWITTER_BIO_CONTAINER = "div.css-175oi2r.r-3pj75a.r-ttdzmv.r-1ifxtd0"
+TWITTER_BIO_SPANS = (
+    ".//div/div/div//span[normalize-space(.)!='']",
+    ".//div/div//span[normalize-space(.)!='']",
+    ".//span[normalize-space(.)!='']",
+)
+
+registry.register("instagram.profile_image", [
+    (By.CSS_SELECTOR, INSTAGRAM_PROFILE_IMAGE),
+    (By.CSS_SELECTOR, "header img[alt*='profile picture']"),
+    (By.CSS_SELECTOR, "header img"),
+])
+registry.register("instagram.bio", [
+    (By.CSS_SELECTOR, INSTAGRAM_BIO),
+    (By.CSS_SELECTOR, "header section span[dir='auto']"),
+])
+registry.register("instagram.caption", [
+    (By.CSS_SELECTOR, INSTAGRAM_CAPTION),
+    (By.CSS_SELECTOR, "article h1"),
+])
+registry.register("instagram.video", [
+    (By.CSS_SELECTOR, INSTAGRAM_VIDEO),
+    (By.CSS_SELECTOR, "article video"),
+])
+registry.register("instagram.carousel_next", [
+    (By.CSS_SELECTOR, INSTAGRAM_CAROUSEL_NEXT),
+    (By.CSS_SELECTOR, "button[aria-label='Next']"),
+])
+registry.register("instagram.carousel_list", [(By.CSS_SELECTOR, INSTAGRAM_CAROUSEL_LIST)])
+registry.register("instagram.carousel_item", [(By.CSS_SELECTOR, INSTAGRAM_CAROUSEL_ITEM)])
+registry.register("instagram.single_image_container", [(By.CSS_SELECTOR, INSTAGRAM_SINGLE_IMAGE_CONTAINER)])
+registry.register("instagram.post_image", [
+    (By.CSS_SELECTOR, INSTAGRAM_POST_IMAGE),
+    (By.CSS_SELECTOR, "img[src]"),
+])
+registry.register("instagram.post_nav", [(By.CSS_SELECTOR, INSTAGRAM_POST_NAV)])
+registry.register("twitter.bio_container", [
+    (By.CSS_SELECTOR, TWITTER_BIO_CONTAINER),
+])
+registry.register("twitter.bio_span", [(By.XPATH, xpath) for xpath in TWITTER_BIO_SPANS])
+
+
+def parse(page_html, base_url=None):
+    tree = lxml_html.fromstring(page_html)
+    for br in tree.iter("br"):
+        br.tail = "\n" + (br.tail or "")
+    if base_url:
+        tree.make_links_absolute(base_url, resolve_base_href=False)
+    return tree
+
+
+def clean_text(element):
+    lines = [" ".join(line.split()) for line in element.text_content().split("\n")]
+    return " ".join(line for line in lines if line)
+
+
+def first(tree, selector):
+    found = tree.cssselect(selector)
+    return found[0] if found else None
+
+
+def find(tree, field):
+    return registry.find(tree, field)
+
+
+def count(page_html, selector):
+    return len(parse(page_html).cssselect(selector))
+
+
+def instagram_profile(page_html, profile_url):
+    tree = parse(page_html, profile_url)
+    username = profile_url.rstrip("/").split("/")[-1]
+
+    img = find(tree, "instagram.profile_image")
+    bio_spans = registry.find_all(tree, "instagram.bio")
+
+    return {
+        "user": {
+            "username": username,
+            "bio": clean_text(bio_spans[-1]) if bio_spans else "",
+            "profile_image": img.get("src", "") if img is not None else ""
+        }
+    }
+
+
+def instagram_post(page_html, base_url=None):
+    tree = parse(page_html, base_url)
+    caption_el = find(tree, "instagram.caption")
+    post = {
+        "caption": clean_text(caption_el) if caption_el is not None else "",
+        "images": [],
+        "has_next_image": False,
+        "nav_buttons": len(registry.find_all(tree, "instagram.post_nav")),
+    }
+
+    video = find(tree, "instagram.video")
+    if video is not None and video.get("src"):
+        post["images"].append(video.get("src"))
+        return post
+
+    if find(tree, "instagram.carousel_next") is not None:
+        post["has_next_image"] = True
+        lists = registry.find_all(tree, "instagram.carousel_list")
+        if lists:
+            for item in registry.find_all(lists[-1], "instagram.carousel_item"):
+                for img in registry.find_all(item, "instagram.post_image"):
+                    src = img.get("src")
+                    if src and src not in post["images"]:
+                        post["images"].append(src)
+        return post
+
+    container = find(tree, "instagram.single_image_container")
+    if container is not None:
+        img = find(container, "instagram.post_image")
+        if img is not None and img.get("src"):
+            post["images"].append(img.get("src"))
+    return post
+
+
+def twitter_profile(page_html, profile_url):
+    tree = parse(page_html, profile_url)
+    biodata = {"username": profile_url.rstrip("/").split("/")[-1], "bio": ""}
+
+    container = find(tree, "twitter.bio_container")
+    if container is None:
+        return biodata
+
+    child_divs = container.xpath("./div")
+    if len(child_divs) < 3:
+        print("⚠️ Expected at least 3 child divs inside the container but found", len(child_divs))
+        return biodata
+
+    span = find(child_divs[2], "twitter.bio_span")
+    if span is not None:
+        biodata["bio"] = clean_text(span)
+    return biodata
+
+
+def twitter_timeline(page_html, base_url="https://x.com/"):
+    tree = parse(page_html, base_url)
+    tweets = []
+    for article in tree.cssselect('article[data-testid="tweet"]'):
+        time_el = first(article, "time")
+        link = None
+        if time_el is not None:
+            links = time_el.xpath("ancestor::a[contains(@href, '/status/')]")
+            link = links[0] if links else None
+        if link is None:
+            link = first(article, 'a[href*="/status/"]')
+        match = re.search(r"/status/(\d+)", link.get("href", "")) if link is not None else None
+        text_el = first(article, '[data-testid="tweetText"]')
+
+        media = []
+        for img in article.cssselect('[data-testid="tweetPhoto"] img, img[src*="/media/"]'):
+            if img.get("src") and img.get("src") not in media:
+                media.append(img.get("src"))
+        for video in article.cssselect("video"):
+            src = video.get("src") or video.get("poster")
+            if src and src not in media:
+                media.append(src)
+
+        tweets.append({
+            "id": match.group(1) if match else None,
+            "url": link.get("href") if link is not None else None,
+            "text": text_el.text_content() if text_el is not None else "",
+            "timestamp": time_el.get("datetime") if time_el is not None else None,
+            "media": media,
+        })
+    return tweets
@@ -0,0 +1,190 @@
+import os
+import sys
+import json
+import time
+import uuid
+import threading
+import contextvars
+from flask import g, request
+
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "data/profiles")
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", 5))
+FORMATS = ("collapsed", "speedscope")
+EXTENSIONS = {"collapsed": "txt", "speedscope": "speedscope.json"}
+
+_active = threading.Lock()
+_sampler = contextvars.ContextVar("profiler", default=None)
+
+
+class Sampler:
+    def __init__(self, interval_sec):
+        self.interval_sec = interval_sec
+        self.samples = {}
+        self.ticks = 0
+        self.started = None
+        self.stopped = None
+        self._idents = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self):
+        self.started = time.time()
+        self._thread.start()
+
+    def stop(self):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        self._thread.join()
+        self.stopped = time.time()
+        _active.release()
+
+    def add(self, ident):
+        with self._lock:
+            if self._stop.is_set() or ident in self._idents:
+                return False
+            self._idents.add(ident)
+            return True
+
+    def discard(self, ident):
+        with self._lock:
+            self._idents.discard(ident)
+
+    def _run(self):
+        while not self._stop.wait(self.interval_sec):
+            self.ticks += 1
+            with self._lock:
+                idents = set(self._idents)
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident not in idents:
+                    continue
+                name = names.get(ident, str(ident))
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_name, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                key = (name, tuple(reversed(stack)))
+                self.samples[key] = self.samples.get(key, 0) + 1
+
+    def collapsed(self):
+        lines = []
+        for (thread_name, stack), count in sorted(self.samples.items(), key=lambda item: -item[1]):
+            frames = [f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",") for name, filename, line in stack]
+            lines.append(";".join([thread_name.replace(";", ","), *frames]) + f" {count}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name):
+        tick_ms = (self.stopped - self.started) * 1000 / max(1, self.ticks)
+        frames = []
+        frame_index = {}
+        threads = {}
+        for (thread_name, stack), count in self.samples.items():
+            indexes = []
+            for frame in stack:
+                if frame not in frame_index:
+                    frame_index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                indexes.append(frame_index[frame])
+            profile = threads.setdefault(thread_name, {"samples": [], "weights": []})
+            profile["samples"].append(indexes)
+            profile["weights"].append(round(count * tick_ms, 3))
+
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "social-hook",
+            "shared": {"frames": frames},
+            "profiles": [
+                {
+                    "type": "sampled",
+                    "name": thread_name,
+                    "unit": "milliseconds",
+                    "startValue": 0,
+                    "endValue": sum(profile["weights"]),
+                    "samples": profile["samples"],
+                    "weights": profile["weights"],
+                }
+                for thread_name, profile in threads.items()
+            ],
+        }
+
+
+def traced(fn, *args, **kwargs):
+    sampler = _sampler.get()
+    ident = threading.get_ident()
+    added = sampler is not None and sampler.add(ident)
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        if added:
+            sampler.discard(ident)
+
+
+def bind(fn):
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(traced, fn, *args, **kwargs)
+
+
+def save(sampler, fmt, path, name):
+    sampler.stop()
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            if fmt == "speedscope":
+                json.dump(sampler.speedscope(name), f)
+            else:
+                f.write(sampler.collapsed())
+        total = sum(sampler.samples.values())
+        print(f"🔬 Saved profile of {name} ({total} samples over {sampler.stopped - sampler.started:.1f}s) to {path}")
+    except Exception as e:
+        print(f"⚠️ Could not save profile to {path}: {e}")
+
+
+def requested_format():
+    value = request.headers.get("X-Profile") or request.args.get("profile")
+    if not value or value.lower() in ("0", "false", "off"):
+        return None
+    return value if value in FORMATS else "collapsed"
+
+
+def install(app, service):
+    @app.before_request
+    def start_profile():
+        _sampler.set(None)
+        fmt = requested_format()
+        if fmt is None:
+            return
+        if not _active.acquire(blocking=False):
+            print(f"⚠️ Another profile is running, serving {request.path} unprofiled")
+            g.profile_skipped = True
+            return
+        sampler = Sampler(PROFILE_INTERVAL_MS / 1000)
+        sampler.add(threading.get_ident())
+        _sampler.set(sampler)
+        sampler.start()
+        g.profile = (sampler, fmt)
+
+    @app.after_request
+    def finish_profile(response):
+        if g.pop("profile_skipped", False):
+            response.headers["X-Profile-Skipped"] = "another profile is running"
+            return response
+        profile = g.pop("profile", None)
+        if profile is None:
+            return response
+        sampler, fmt = profile
+        name = f"{service} {request.method} {request.path}"
+        path = os.path.join(PROFILE_DIR, f"{service}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.{EXTENSIONS[fmt]}")
+        response.headers["X-Profile-Path"] = path
+        response.call_on_close(lambda: save(sampler, fmt, path, name))
+        return response
+
+    @app.teardown_request
+    def abandon_profile(error):
+        profile = g.pop("profile", None)
+        if profile is not None:
+            profile[0].stop()
@@ -0,0 +1,69 @@
+import math
+import time
+import threading
+from contextlib import contextmanager
+
+
+class ReplicaUnavailable(Exception):
+    pass
+
+
+def parse_replicas(value, default):
+    urls = [url.strip().rstrip("/") for url in (value or "").split(",") if url.strip()]
+    return urls or [default]
+
+
+class ReplicaSet:
+    def __init__(self, platform, urls, per_replica=2, shard_size=0, acquire_timeout=60):
+        self.platform = platform
+        self.urls = list(urls)
+        self.per_replica = max(1, per_replica)
+        self.shard_size = shard_size
+        self.acquire_timeout = acquire_timeout
+        self.in_flight = {url: 0 for url in self.urls}
+        self.served = {url: 0 for url in self.urls}
+        self._cond = threading.Condition()
+
+    @property
+    def capacity(self):
+        return len(self.urls) * self.per_replica
+
+    def shards(self, items):
+        size = max(1, self.shard_size or math.ceil(len(items) / len(self.urls)))
+        return [items[i:i + size] for i in range(0, len(items), size)] or [items]
+
+    def acquire(self, timeout=None):
+        if timeout is None:
+            timeout = self.acquire_timeout
+        wait_until = time.time() + timeout
+        with self._cond:
+            while True:
+                url = min(self.urls, key=lambda u: (self.in_flight[u], self.served[u]))
+                if self.in_flight[url] < self.per_replica:
+                    self.in_flight[url] += 1
+                    self.served[url] += 1
+                    return url
+                left = wait_until - time.time()
+                if left <= 0:
+                    raise ReplicaUnavailable(f"No {self.platform} replica became free within {timeout:g}s")
+                self._cond.wait(left)
+
+    def release(self, url):
+        with self._cond:
+            self.in_flight[url] -= 1
+            self._cond.notify()
+
+    @contextmanager
+    def replica(self, timeout=None):
+        url = self.acquire(timeout)
+        try:
+            yield url
+        finally:
+            self.release(url)
+
+    def stats(self):
+        with self._cond:
+            return [
+                {"url": url, "in_flight": self.in_flight[url], "served": self.served[url]}
+                for url in self.urls
+            ]
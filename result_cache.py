@@ -0,0 +1,122 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+def normalize_username(username):
+    return (username or "").rstrip("/").split("/")[-1].lower()
+
+
+class Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.record = None
+
+
+class ResultCache:
+    def __init__(self, db_path, ttl_sec=3600, max_entries=5000, stale_sec=86400):
+        self.db_path = db_path
+        self.ttl_sec = ttl_sec
+        self.stale_sec = stale_sec
+        self.max_entries = max_entries
+        self.flights = {}
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "stale": 0, "stored": 0, "evictions": 0}
+
+        if os.path.dirname(db_path):
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    @staticmethod
+    def key(platform, username, total_posts):
+        return json.dumps([platform, normalize_username(username), total_posts])
+
+    def get(self, key, stale=False):
+        now = time.time()
+        oldest = now - self.stale_sec if stale else now
+        with self._connect() as conn:
+            row = conn.execute("SELECT value FROM results WHERE key = ? AND expires_at > ?", (key, oldest)).fetchone()
+            if row is None:
+                return None
+            conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(row[0])
+
+    def put(self, key, value):
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO results (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), now + self.ttl_sec, now),
+            )
+            self.count("stored")
+            self._evict(conn)
+
+    def _evict(self, conn):
+        expired = conn.execute("DELETE FROM results WHERE expires_at <= ?", (time.time() - self.stale_sec,)).rowcount
+        total = conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+        overflow = max(0, total - self.max_entries)
+        if overflow:
+            conn.execute(
+                "DELETE FROM results WHERE key IN (SELECT key FROM results ORDER BY last_access LIMIT ?)",
+                (overflow,),
+            )
+        if expired or overflow:
+            self.count("evictions", expired + overflow)
+
+    def claim(self, keys):
+        leading = []
+        following = {}
+        with self._lock:
+            for key in keys:
+                if key in self.flights:
+                    following[key] = self.flights[key]
+                else:
+                    self.flights[key] = Flight()
+                    leading.append(key)
+        return leading, following
+
+    def resolve(self, key, record, store=True):
+        if store and record["type"] == "result":
+            self.put(key, record["data"])
+        with self._lock:
+            flight = self.flights.pop(key, None)
+        if flight is not None:
+            flight.record = record
+            flight.done.set()
+
+    def stats(self):
+        with self._connect() as conn:
+            entries = conn.execute("SELECT COUNT(*) FROM results WHERE expires_at > ?", (time.time(),)).fetchone()[0]
+        with self._lock:
+            return {
+                **self.counters,
+                "entries": entries,
+                "in_flight": len(self.flights),
+                "ttl_sec": self.ttl_sec,
+                "max_entries": self.max_entries,
+            }
@@ -0,0 +1,113 @@
+import os
+import time
+import threading
+from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
+import waits
+
+
+DEMOTE_AFTER_MISSES = int(os.getenv("SELECTOR_DEMOTE_AFTER_MISSES", 3))
+DEMOTE_SEC = float(os.getenv("SELECTOR_DEMOTE_SEC", 60))
+
+
+class Locator:
+    def __init__(self, by, value, order):
+        self.by = by
+        self.value = value
+        self.order = order
+        self.hits = 0
+        self.misses = 0
+        self.hit_sec = 0.0
+        self.miss_streak = 0
+        self.demoted_until = 0.0
+
+    def rank(self):
+        return (time.time() < self.demoted_until, self.order)
+
+    def stats(self):
+        tries = self.hits + self.misses
+        return {
+            "by": self.by,
+            "value": self.value,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / tries, 3) if tries else None,
+            "avg_hit_ms": round(self.hit_sec / self.hits * 1000, 2) if self.hits else None,
+            "demoted": time.time() < self.demoted_until,
+        }
+
+
+def query(node, by, value):
+    if hasattr(node, "cssselect"):
+        return node.cssselect(value) if by == By.CSS_SELECTOR else node.xpath(value)
+    return node.find_elements(by, value)
+
+
+class SelectorRegistry:
+    def __init__(self):
+        self.fields = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, candidates):
+        self.fields[name] = [Locator(by, value, i) for i, (by, value) in enumerate(candidates)]
+
+    def candidates(self, name):
+        with self._lock:
+            return sorted(self.fields[name], key=Locator.rank)
+
+    def _record(self, attempts):
+        with self._lock:
+            for locator, found, elapsed in attempts:
+                if found:
+                    locator.hits += 1
+                    locator.hit_sec += elapsed
+                    locator.miss_streak = 0
+                    locator.demoted_until = 0.0
+                else:
+                    locator.misses += 1
+                    locator.miss_streak += 1
+                    if locator.miss_streak >= DEMOTE_AFTER_MISSES:
+                        locator.demoted_until = time.time() + DEMOTE_SEC
+
+    def css(self, name):
+        return [locator.value for locator in self.candidates(name) if locator.by == By.CSS_SELECTOR]
+
+    def _query(self, node, name):
+        attempts = []
+        for locator in self.candidates(name):
+            start = time.time()
+            try:
+                found = query(node, locator.by, locator.value)
+            except WebDriverException:
+                found = []
+            attempts.append((locator, bool(found), time.time() - start))
+            if found:
+                return found, attempts
+        return [], attempts
+
+    def find_all(self, node, name):
+        found, attempts = self._query(node, name)
+        self._record(attempts)
+        return found
+
+    def find(self, node, name):
+        found = self.find_all(node, name)
+        return found[0] if found else None
+
+    def wait_for(self, driver, name, timeout, node=None):
+        last = {"attempts": []}
+
+        def poll(d):
+            found, last["attempts"] = self._query(node if node is not None else d, name)
+            return found or False
+
+        found = waits.until(driver, f"selector.{name}", poll, timeout)
+        self._record(last["attempts"])
+        return found or []
+
+    def stats(self):
+        with self._lock:
+            return {name: [locator.stats() for locator in locators] for name, locators in self.fields.items()}
+
+
+registry = SelectorRegistry()
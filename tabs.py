@@ -0,0 +1,92 @@
+import time
+from collections import deque
+from browser import network_capture, reapply_blocking
+from deadline import DeadlineExceeded
+
+
+POLL_SEC = 0.1
+
+START_NAVIGATION_JS = """
+window.__tabScheduled = true;
+window.location.href = arguments[0];
+"""
+
+NAVIGATION_READY_JS = """
+return !window.__tabScheduled && document.readyState !== "loading";
+"""
+
+
+class TabScheduler:
+    def __init__(self, driver, tabs=1, load_timeout=30):
+        self.driver = driver
+        self.tabs = max(1, tabs)
+        self.load_timeout = load_timeout
+        self.handles = []
+
+    def open_tabs(self):
+        handles = self.driver.window_handles
+        while len(handles) < self.tabs:
+            self.driver.switch_to.new_window("tab")
+            reapply_blocking(self.driver)
+            handles = self.driver.window_handles
+        self.handles = handles[:self.tabs]
+        network_capture(self.driver).per_tab = len(self.handles) > 1
+
+    def start(self, handle, url):
+        self.driver.switch_to.window(handle)
+        network_capture(self.driver).clear()
+        self.driver.execute_script(START_NAVIGATION_JS, url)
+
+    def is_loaded(self, handle, started):
+        self.driver.switch_to.window(handle)
+        if time.time() - started > self.load_timeout:
+            return True
+        try:
+            return bool(self.driver.execute_script(NAVIGATION_READY_JS))
+        except Exception:
+            return False
+
+    def run(self, jobs, url_for, scrape, stop=None):
+        stop = stop or (lambda: False)
+        if self.tabs == 1:
+            network_capture(self.driver).per_tab = False
+            jobs = list(jobs)
+            for i, job in enumerate(jobs):
+                if stop():
+                    for skipped in jobs[i:]:
+                        yield skipped, None, DeadlineExceeded()
+                    return
+                try:
+                    yield job, scrape(job, True), None
+                except Exception as e:
+                    yield job, None, e
+            return
+
+        self.open_tabs()
+        queue = deque(jobs)
+        active = {}
+
+        while queue or active:
+            if stop():
+                for job, _ in active.values():
+                    yield job, None, DeadlineExceeded()
+                for job in queue:
+                    yield job, None, DeadlineExceeded()
+                return
+
+            for handle in self.handles:
+                if handle not in active and queue:
+                    job = queue.popleft()
+                    self.start(handle, url_for(job))
+                    active[handle] = (job, time.time())
+
+            ready = next((h for h, (_, started) in active.items() if self.is_loaded(h, started)), None)
+            if ready is None:
+                time.sleep(POLL_SEC)
+                continue
+
+            job, _ = active.pop(ready)
+            try:
+                yield job, scrape(job, False), None
+            except Exception as e:
+                yield job, None, e
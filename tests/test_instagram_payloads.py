@@ -0,0 +1,64 @@
+import json
+import os
+
+import instagram
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_profile_payload_decodes_user_and_posts():
+    profile, posts = instagram.parse_profile_payload(load("instagram_web_profile_info.json"))
+
+    assert profile == {
+        "username": "someone",
+        "bio": "Line one Line two",
+        "profile_image": "https://cdn.example/pic_hd.jpg",
+    }
+    assert posts == [
+        {"id": "AAA111", "caption": "First post", "images": ["https://cdn.example/a.jpg"]},
+        {"id": "BBB222", "caption": "", "images": ["https://cdn.example/b1.jpg", "https://cdn.example/b2.mp4"]},
+        {"id": "CCC333", "caption": "", "images": ["https://cdn.example/c.mp4"]},
+    ]
+
+
+def test_profile_payload_without_user_is_ignored():
+    assert instagram.parse_profile_payload(None) == (None, [])
+    assert instagram.parse_profile_payload({}) == (None, [])
+    assert instagram.parse_profile_payload({"data": {"user": None}}) == (None, [])
+    assert instagram.parse_profile_payload({"data": {"user": {"username": "someone"}}}) == (None, [])
+
+
+def test_profile_payload_without_timeline_has_no_posts():
+    profile, posts = instagram.parse_profile_payload({"data": {"user": {"username": "someone", "biography": None}}})
+
+    assert profile == {"username": "someone", "bio": "", "profile_image": ""}
+    assert posts == []
+
+
+def test_feed_payload_decodes_items_and_carousels():
+    posts = instagram.parse_timeline_payload(load("instagram_feed_user.json"))
+
+    assert posts == [
+        {"id": "DDD444", "caption": "Feed caption", "images": ["https://cdn.example/d_large.jpg"]},
+        {"id": "EEE555", "caption": "", "images": ["https://cdn.example/e1.jpg", "https://cdn.example/e2.mp4"]},
+    ]
+
+
+def test_graphql_timeline_payload_decodes_edges():
+    posts = instagram.parse_timeline_payload(load("instagram_timeline_graphql.json"))
+
+    assert posts == [{"id": "FFF666", "caption": "GraphQL caption", "images": ["https://cdn.example/f.jpg"]}]
+
+
+def test_timeline_payload_without_media_is_empty():
+    assert instagram.parse_timeline_payload(None) == []
+    assert instagram.parse_timeline_payload([]) == []
+    assert instagram.parse_timeline_payload({}) == []
+    assert instagram.parse_timeline_payload({"data": {"viewer": {"edges": []}}}) == []
+    assert instagram.parse_timeline_payload({"items": []}) == []
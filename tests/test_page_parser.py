@@ -0,0 +1,86 @@
+import os
+
+import page_parser
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_instagram_profile_uses_fallback_selectors():
+    assert page_parser.instagram_profile(load("instagram_profile.html"), "https://www.instagram.com/someone/") == {
+        "user": {
+            "username": "someone",
+            "bio": "Photographer Based somewhere",
+            "profile_image": "https://www.instagram.com/static/someone.jpg",
+        }
+    }
+
+
+def test_instagram_profile_on_empty_page():
+    assert page_parser.instagram_profile("<html><body></body></html>", "https://www.instagram.com/someone") == {
+        "user": {"username": "someone", "bio": "", "profile_image": ""}
+    }
+
+
+def test_instagram_carousel_post():
+    assert page_parser.instagram_post(load("instagram_post_carousel.html")) == {
+        "caption": "Sunset at the beach",
+        "images": ["https://cdn.example/1.jpg", "https://cdn.example/2.jpg"],
+        "has_next_image": True,
+        "nav_buttons": 2,
+    }
+
+
+def test_instagram_video_and_single_image_posts():
+    video = '<article><h1>Clip</h1><video class="x1lliihq x5yr21d xh8yej3" src="https://cdn.example/v.mp4"></video></article>'
+    single = '<article><div class="_aagu _aato"><img src="https://cdn.example/s.jpg"></div></article>'
+
+    assert page_parser.instagram_post(video)["images"] == ["https://cdn.example/v.mp4"]
+    assert page_parser.instagram_post(single) == {
+        "caption": "",
+        "images": ["https://cdn.example/s.jpg"],
+        "has_next_image": False,
+        "nav_buttons": 0,
+    }
+
+
+def test_twitter_profile_bio():
+    assert page_parser.twitter_profile(load("twitter_profile.html"), "https://x.com/someone") == {
+        "username": "someone",
+        "bio": "Building things in public",
+    }
+
+
+def test_twitter_profile_without_bio_container():
+    assert page_parser.twitter_profile("<html><body><div></div></body></html>", "https://x.com/someone/") == {
+        "username": "someone",
+        "bio": "",
+    }
+
+
+def test_twitter_timeline():
+    assert page_parser.twitter_timeline(load("twitter_timeline.html")) == [
+        {
+            "id": "200",
+            "url": "https://x.com/someone/status/200",
+            "text": "Hello world",
+            "timestamp": "2025-01-02T03:04:05.000Z",
+            "media": ["https://pbs.twimg.com/media/a.jpg"],
+        },
+        {
+            "id": "201",
+            "url": "https://x.com/someone/status/201/analytics",
+            "text": "Video only",
+            "timestamp": None,
+            "media": ["https://pbs.twimg.com/thumb.jpg"],
+        },
+    ]
+
+
+def test_twitter_timeline_without_tweets():
+    assert page_parser.twitter_timeline("<html><body><p>Nothing here</p></body></html>") == []
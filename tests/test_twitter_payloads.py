@@ -0,0 +1,74 @@
+import json
+import os
+
+import xtwitter
+
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+def load(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_user_payload_decodes_biodata():
+    assert xtwitter.parse_user_payload(load("twitter_user_by_screen_name.json")) == {
+        "username": "someone",
+        "bio": "Building things in public",
+    }
+
+
+def test_user_payload_ignores_missing_user_and_timelines():
+    assert xtwitter.parse_user_payload(None) is None
+    assert xtwitter.parse_user_payload({}) is None
+    assert xtwitter.parse_user_payload({"data": {"user": {"result": {"__typename": "UserUnavailable"}}}}) is None
+    assert xtwitter.parse_user_payload(load("twitter_user_tweets.json")) is None
+
+
+def test_timeline_payload_decodes_tweets_and_cursor():
+    tweets, cursor = xtwitter.parse_timeline_payload(load("twitter_user_tweets.json"))
+
+    assert cursor == "BOTTOM"
+    assert tweets == [
+        {
+            "id": "100",
+            "url": "https://x.com/someone/status/100",
+            "caption": "A long pinned note tweet",
+            "timestamp": "2018-10-10T20:19:24.000Z",
+            "media": [],
+        },
+        {
+            "id": "101",
+            "url": "https://x.com/someone/status/101",
+            "caption": "Photo and video",
+            "timestamp": "2025-01-02T03:04:05.000Z",
+            "media": ["https://pbs.twimg.com/media/photo.jpg", "https://video.twimg.com/high.mp4"],
+        },
+        {
+            "id": "102",
+            "url": "https://x.com/someone/status/102",
+            "caption": "Limited visibility",
+            "timestamp": "2025-01-03T03:04:05.000Z",
+            "media": [],
+        },
+    ]
+
+
+def test_timeline_payload_without_timeline_is_empty():
+    assert xtwitter.parse_timeline_payload(None) == ([], None)
+    assert xtwitter.parse_timeline_payload({}) == ([], None)
+    assert xtwitter.parse_timeline_payload(load("twitter_user_by_screen_name.json")) == ([], None)
+
+
+def test_tweet_result_handles_missing_fields():
+    assert xtwitter.parse_tweet_result(None) is None
+    assert xtwitter.parse_tweet_result({"__typename": "TweetTombstone"}) is None
+    assert xtwitter.parse_tweet_result({"__typename": "TweetWithVisibilityResults"}) is None
+    assert xtwitter.parse_tweet_result({"rest_id": "7", "legacy": {"created_at": "not a date"}}) == {
+        "id": "7",
+        "url": "https://x.com/i/web/status/7",
+        "caption": "",
+        "timestamp": None,
+        "media": [],
+    }
@@ -0,0 +1,98 @@
+import os
+import time
+import threading
+from functools import wraps
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+
+BUCKETS = [float(b) for b in os.getenv("TIMING_BUCKETS", "0.05,0.1,0.25,0.5,1,2.5,5,10,30,60,120,300").split(",")]
+
+_histograms = {}
+_lock = threading.Lock()
+_timings = ContextVar("timings", default=None)
+
+
+def observe(stage, seconds):
+    with _lock:
+        h = _histograms.setdefault(stage, {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0})
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                h["buckets"][i] += 1
+        h["count"] += 1
+        h["sum"] += seconds
+        timings = _timings.get()
+        if timings is not None:
+            timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def span(stage):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+def timed(stage):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def collect(enabled=True):
+    if not enabled:
+        yield None
+        return
+    timings = {}
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def rounded(timings):
+    with _lock:
+        return {stage: round(seconds, 3) for stage, seconds in timings.items()}
+
+
+def aggregate(timings_list):
+    totals = {}
+    for timings in timings_list:
+        for stage, seconds in (timings or {}).items():
+            s = totals.setdefault(stage, {"count": 0, "total_sec": 0.0, "max_sec": 0.0})
+            s["count"] += 1
+            s["total_sec"] += seconds
+            s["max_sec"] = max(s["max_sec"], seconds)
+    return {
+        stage: {
+            "count": s["count"],
+            "total_sec": round(s["total_sec"], 3),
+            "avg_sec": round(s["total_sec"] / s["count"], 3),
+            "max_sec": round(s["max_sec"], 3),
+        }
+        for stage, s in totals.items()
+    }
+
+
+def render_metrics(service):
+    lines = [
+        "# HELP scrape_stage_seconds Time spent in each scrape stage.",
+        "# TYPE scrape_stage_seconds histogram",
+    ]
+    with _lock:
+        for stage, h in sorted(_histograms.items()):
+            labels = f'service="{service}",stage="{stage}"'
+            for bound, count in zip(BUCKETS, h["buckets"]):
+                lines.append(f'scrape_stage_seconds_bucket{{{labels},le="{bound:g}"}} {count}')
+            lines.append(f'scrape_stage_seconds_bucket{{{labels},le="+Inf"}} {h["count"]}')
+            lines.append(f"scrape_stage_seconds_sum{{{labels}}} {h['sum']:.6f}")
+            lines.append(f"scrape_stage_seconds_count{{{labels}}} {h['count']}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,99 @@
+import os
+import time
+import threading
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.support.ui import WebDriverWait
+import deadline
+
+
+DOM_QUIET_MS = int(os.getenv("WAIT_DOM_QUIET_MS", 300))
+POLL_SEC = 0.05
+
+_stats = {}
+_lock = threading.Lock()
+
+DOM_QUIET_JS = """
+const quietMs = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+let quietTimer = null, hardTimer = null;
+const observer = new MutationObserver(() => {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => finish(true), quietMs);
+});
+function finish(ok) {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(hardTimer);
+    done(ok);
+}
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+quietTimer = setTimeout(() => finish(true), quietMs);
+hardTimer = setTimeout(() => finish(false), timeoutMs);
+"""
+
+
+def record(step, elapsed, timed_out):
+    with _lock:
+        s = _stats.setdefault(step, {"count": 0, "total_sec": 0.0, "max_sec": 0.0, "timeouts": 0})
+        s["count"] += 1
+        s["total_sec"] += elapsed
+        s["max_sec"] = max(s["max_sec"], elapsed)
+        if timed_out:
+            s["timeouts"] += 1
+
+
+def stats():
+    with _lock:
+        return {
+            step: {
+                "count": s["count"],
+                "avg_ms": round(s["total_sec"] / s["count"] * 1000, 1),
+                "max_ms": round(s["max_sec"] * 1000, 1),
+                "timeouts": s["timeouts"],
+            }
+            for step, s in _stats.items()
+        }
+
+
+def until(driver, step, condition, timeout):
+    timeout = deadline.clamp(timeout)
+    start = time.time()
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_SEC).until(condition)
+        record(step, time.time() - start, False)
+        return result
+    except TimeoutException:
+        record(step, time.time() - start, True)
+        return None
+
+
+def _async_script(driver, step, script, *args, timeout):
+    start = time.time()
+    try:
+        driver.set_script_timeout(timeout + 1)
+        ok = bool(driver.execute_async_script(script, *args))
+    except WebDriverException:
+        ok = False
+    record(step, time.time() - start, not ok)
+    return ok
+
+
+def document_ready(driver, step, timeout):
+    return until(
+        driver, step,
+        lambda d: d.execute_script("return document.readyState;") in ("interactive", "complete"),
+        timeout
+    ) is not None
+
+
+def dom_quiet(driver, step, timeout, quiet_ms=DOM_QUIET_MS):
+    timeout = deadline.clamp(timeout)
+    return _async_script(driver, step, DOM_QUIET_JS, quiet_ms, int(timeout * 1000), timeout=timeout)
+
+
+def page_ready(driver, step, timeout):
+    document_ready(driver, f"{step}.document", timeout)
+    return dom_quiet(driver, f"{step}.dom", timeout)
+
+
+def url_changes(driver, step, old_url, timeout):
+    return until(driver, step, lambda d: d.current_url != old_url, timeout) is not None
@@ -0,0 +1,286 @@
+import os
+import time
+import uuid
+import queue
+import atexit
+import importlib
+import threading
+import multiprocessing
+from driver_pool import DriverPool
+import timing
+
+
+PROFILE_ROOT = os.getenv("CHROME_PROFILE_ROOT", "data/chrome-profiles")
+LOGIN_MARKER = ".logged_in"
+RESULT_TIMEOUT_SEC = float(os.getenv("WORKER_RESULT_TIMEOUT_SEC", 300))
+
+
+def persistent_driver(module, profile_dir):
+    os.makedirs(profile_dir, exist_ok=True)
+    marker = os.path.join(profile_dir, LOGIN_MARKER)
+    driver, wait = module.setup_driver(user_data_dir=profile_dir)
+
+    try:
+        stale = not os.path.exists(marker) or (
+            os.path.exists(module.COOKIES_FILE) and os.path.getmtime(module.COOKIES_FILE) > os.path.getmtime(marker)
+        )
+        if stale:
+            module.login_with_cookies(driver, 0)
+            if os.path.exists(module.COOKIES_FILE):
+                with open(marker, "w", encoding="utf-8") as f:
+                    f.write(str(time.time()))
+        else:
+            driver.get(module.HOME_URL)
+            print(f"🔑 Reusing browser profile {profile_dir}")
+    except Exception:
+        driver.quit()
+        raise
+    return driver, wait
+
+
+def worker_main(module_name, slot, max_tasks, tasks, results):
+    module = importlib.import_module(module_name)
+    profile_dir = os.path.join(PROFILE_ROOT, f"{module_name}-{slot}")
+    module.driver_pool = DriverPool(
+        lambda: persistent_driver(module, profile_dir),
+        size=1,
+        max_pages=module.DRIVER_MAX_PAGES,
+    )
+
+    try:
+        module.driver_pool.warm_up(1)
+        for _ in range(max_tasks):
+            task = tasks.get()
+            if task is None:
+                break
+            task_id, usernames, options = task
+            try:
+                for record in module.iter_scrape_local(usernames, **options):
+                    results.put(("record", task_id, record))
+            except Exception as e:
+                results.put(("failed", task_id, str(e)))
+            results.put(("done", slot, task_id))
+    finally:
+        module.driver_pool.close_all()
+
+
+class WorkerPool:
+    def __init__(self, module_name, processes, max_tasks=50, result_timeout=RESULT_TIMEOUT_SEC):
+        self.module_name = module_name
+        self.processes = max(1, processes)
+        self.max_tasks = max(1, max_tasks)
+        self.result_timeout = result_timeout
+        self.ctx = multiprocessing.get_context("spawn")
+        self.results = None
+        self.queues = {}
+        self.workers = {}
+        self.assigned = {}
+        self.sent = {}
+        self.tasks = {}
+        self.restarts = 0
+        self.failures = {}
+        self.respawn_at = {}
+        self.closing = False
+        self._lock = threading.Lock()
+        self._monitor_thread = None
+
+    def start(self):
+        with self._lock:
+            if self._monitor_thread is not None:
+                return
+            self.results = self.ctx.Queue()
+            for slot in range(self.processes):
+                self.queues[slot] = self.ctx.Queue()
+                self.assigned[slot] = []
+                self.sent[slot] = None
+                self._spawn(slot)
+            self._monitor_thread = threading.Thread(target=self._monitor, name=f"{self.module_name}-workers", daemon=True)
+            self._monitor_thread.start()
+        atexit.register(self.close)
+        print(f"🏭 Started {self.processes} {self.module_name} worker processes")
+
+    def _spawn(self, slot):
+        process = self.ctx.Process(
+            target=worker_main,
+            args=(self.module_name, slot, self.max_tasks, self.queues[slot], self.results),
+            name=f"{self.module_name}-worker-{slot}",
+            daemon=True,
+        )
+        process.start()
+        self.workers[slot] = process
+
+    def _fail_remaining(self, task, error):
+        for username in task["remaining"]:
+            task["queue"].put({"type": "error", "username": username, "error": error})
+        task["remaining"] = []
+
+    def _dispatch(self, slot):
+        while self.sent[slot] is None and self.assigned[slot]:
+            task_id = self.assigned[slot][0]
+            task = self.tasks.get(task_id)
+            if task is None:
+                self.assigned[slot].pop(0)
+                continue
+            self.sent[slot] = task_id
+            self.queues[slot].put((task_id, task["usernames"], task["options"]))
+
+    def _skip_queued(self, task_id):
+        for slot, assigned in self.assigned.items():
+            if task_id in assigned and self.sent[slot] != task_id:
+                assigned.remove(task_id)
+
+    def _finish(self, slot, task_id):
+        if task_id in self.assigned[slot]:
+            self.assigned[slot].remove(task_id)
+        if self.sent[slot] == task_id:
+            self.sent[slot] = None
+        task = self.tasks.pop(task_id, None)
+        if task is not None:
+            task["queue"].put(None)
+        self._dispatch(slot)
+
+    def _handle(self, message):
+        kind = message[0]
+        with self._lock:
+            if kind == "record":
+                _, task_id, record = message
+                task = self.tasks.get(task_id)
+                if task is None:
+                    return
+                if record.get("username") in task["remaining"]:
+                    task["remaining"].remove(record["username"])
+                task["queue"].put(record)
+            elif kind == "failed":
+                _, task_id, error = message
+                if task_id in self.tasks:
+                    self._fail_remaining(self.tasks[task_id], error)
+            elif kind == "done":
+                _, slot, task_id = message
+                self.failures[slot] = 0
+                self._finish(slot, task_id)
+
+    def _abandon(self, task_ids, error):
+        records = []
+        with self._lock:
+            for task_id in task_ids:
+                task = self.tasks.pop(task_id, None)
+                if task is None:
+                    continue
+                records.extend({"type": "error", "username": username, "error": error} for username in task["remaining"])
+                self._skip_queued(task_id)
+                for slot, running in self.sent.items():
+                    if running == task_id and self.workers[slot].is_alive():
+                        print(f"⏱️ {self.module_name} worker {slot} stopped responding, terminating it")
+                        self.workers[slot].terminate()
+        return records
+
+    def _drain(self):
+        while True:
+            try:
+                self._handle(self.results.get_nowait())
+            except queue.Empty:
+                return
+
+    def _check_workers(self):
+        if self.closing:
+            return
+        dead = [slot for slot, process in self.workers.items() if not process.is_alive() and slot not in self.respawn_at]
+        if dead:
+            self._drain()
+
+        for slot in dead:
+            exitcode = self.workers[slot].exitcode
+            with self._lock:
+                if exitcode and self.sent[slot] is not None:
+                    task_id = self.sent[slot]
+                    print(f"💥 {self.module_name} worker {slot} crashed (exit code {exitcode}) during a task")
+                    if task_id in self.tasks:
+                        self._fail_remaining(self.tasks[task_id], f"Worker process crashed (exit code {exitcode})")
+                    self._finish(slot, task_id)
+                elif exitcode:
+                    print(f"💥 {self.module_name} worker {slot} exited with code {exitcode}")
+                else:
+                    print(f"♻️ Recycling {self.module_name} worker {slot} after {self.max_tasks} tasks")
+
+                self.failures[slot] = self.failures.get(slot, 0) + 1 if exitcode else 0
+                delay = min(60, 2 ** (self.failures[slot] - 1)) if exitcode else 0
+                self.respawn_at[slot] = time.time() + delay
+
+        for slot, respawn_at in list(self.respawn_at.items()):
+            if time.time() >= respawn_at:
+                del self.respawn_at[slot]
+                self.restarts += 1
+                self._spawn(slot)
+
+    def _monitor(self):
+        while True:
+            try:
+                self._handle(self.results.get(timeout=1))
+            except queue.Empty:
+                pass
+            except (EOFError, OSError):
+                return
+            self._check_workers()
+
+    def scrape(self, usernames, **options):
+        self.start()
+        wants_timings = options.get("timings", False)
+        options = {**options, "timings": True}
+        shards = [usernames[i::self.processes] for i in range(self.processes)]
+        shards = [shard for shard in shards if shard]
+        out = queue.Queue()
+        task_ids = []
+
+        with self._lock:
+            for shard in shards:
+                task_id = uuid.uuid4().hex
+                slot = min(self.assigned, key=lambda s: len(self.assigned[s]))
+                self.tasks[task_id] = {"queue": out, "remaining": list(shard), "usernames": shard, "options": options}
+                self.assigned[slot].append(task_id)
+                self._dispatch(slot)
+                task_ids.append(task_id)
+
+        try:
+            pending = len(shards)
+            while pending:
+                try:
+                    record = out.get(timeout=self.result_timeout)
+                except queue.Empty:
+                    yield from self._abandon(task_ids, f"No result from {self.module_name} worker within {self.result_timeout:.0f}s")
+                    return
+                if record is None:
+                    pending -= 1
+                    continue
+                if record["type"] == "result":
+                    stages = record["data"].pop("timings", None) or {}
+                    for stage, seconds in stages.items():
+                        timing.observe(stage, seconds)
+                    if wants_timings:
+                        record["data"]["timings"] = stages
+                yield record
+        finally:
+            with self._lock:
+                for task_id in task_ids:
+                    self.tasks.pop(task_id, None)
+                    self._skip_queued(task_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "processes": self.processes,
+                "alive": sum(1 for p in self.workers.values() if p.is_alive()),
+                "queued_tasks": sum(len(tasks) for tasks in self.assigned.values()),
+                "restarts": self.restarts,
+                "max_tasks": self.max_tasks,
+            }
+
+    def close(self):
+        if self.results is None:
+            return
+        self.closing = True
+        for slot_queue in self.queues.values():
+            slot_queue.put(None)
+        for process in self.workers.values():
+            process.join(timeout=10)
+            if process.is_alive():
+                process.terminate()
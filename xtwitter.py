@@ -1,38 +1,66 @@
 import os
 import time
 import json
+import threading
+from datetime import datetime
 from pathlib import Path
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import NoSuchElementException, TimeoutException
-from webdriver_manager.chrome import ChromeDriverManager
-
-
+from selenium.common.exceptions import TimeoutException
+from browser import LEAN_DRIVER, build_chrome_options, chrome_service, chromedriver_path, block_resources, network_capture
+from driver_pool import DriverPool
+from tabs import TabScheduler
+from worker_pool import WorkerPool
+from page_parser import PAGE_PARSER
+import page_parser
+from selector_registry import registry as selectors
+import waits
+import deadline
+import timing
+import profiling
+
+
+HOME_URL = "https://x.com/"
 COOKIES_FILE = "credentials/twitter_cookies.json"
 WAIT_SEC = 2
 TOTAL_POSTS_TO_SCRAPE = 5
-
-def setup_driver():
+DRIVER_POOL_SIZE = int(os.getenv("TWITTER_DRIVER_POOL_SIZE", 2))
+DRIVER_MAX_PAGES = int(os.getenv("TWITTER_DRIVER_MAX_PAGES", 200))
+STEP_TIMEOUT = float(os.getenv("TWITTER_STEP_TIMEOUT", 5))
+TWITTER_EXTRACTION = os.getenv("TWITTER_EXTRACTION", "network")
+MAX_SCROLL_STALLS = int(os.getenv("TWITTER_MAX_SCROLL_STALLS", 3))
+TABS_PER_BROWSER = int(os.getenv("TWITTER_TABS_PER_BROWSER", 3))
+MAX_TABS_PER_BROWSER = int(os.getenv("TWITTER_MAX_TABS_PER_BROWSER", 8))
+WORKER_PROCESSES = int(os.getenv("TWITTER_WORKER_PROCESSES", 0))
+WORKER_MAX_TASKS = int(os.getenv("TWITTER_WORKER_MAX_TASKS", 50))
+WARM_BROWSERS = int(os.getenv("TWITTER_WARM_BROWSERS", DRIVER_POOL_SIZE))
+TWITTER_BLOCKED_PATTERNS = ["*pbs.twimg.com/media/*", "*pbs.twimg.com/profile_*", "*video.twimg.com/*"]
+
+@timing.timed("twitter.chrome_launch")
+def setup_driver(lean=LEAN_DRIVER, user_data_dir=None):
     os.makedirs(os.path.dirname(COOKIES_FILE), exist_ok=True)
 
-    options = webdriver.ChromeOptions()
+    options = build_chrome_options(lean, capture_network=True, user_data_dir=user_data_dir)
 
-    service = Service(ChromeDriverManager().install())
+    service = chrome_service()
     driver = webdriver.Chrome(service=service, options=options)
     wait = WebDriverWait(driver, WAIT_SEC)
-    driver.maximize_window()
+    if lean:
+        block_resources(driver, extra_patterns=TWITTER_BLOCKED_PATTERNS)
+    else:
+        driver.maximize_window()
 
     return driver, wait
 
 
+@timing.timed("twitter.login")
 def login_with_cookies(driver, wait_sec):
     
-    driver.get("https://x.com/")
-    time.sleep(WAIT_SEC)
+    driver.get(HOME_URL)
+    waits.document_ready(driver, "twitter.home", STEP_TIMEOUT)
 
     if os.path.exists(COOKIES_FILE):
         with open(COOKIES_FILE, "r", encoding="utf-8") as f:
@@ -51,7 +79,7 @@ def login_with_cookies(driver, wait_sec):
                     except Exception as e:
                         print("⚠️ Skipped a cookie due to:", e)
         driver.refresh()
-        time.sleep(WAIT_SEC)
+        waits.page_ready(driver, "twitter.login_refresh", STEP_TIMEOUT)
         print("Logged in with cookies.")
         return
     else:
@@ -64,19 +92,24 @@ def login_with_cookies(driver, wait_sec):
         print("Cookies saved.")
         return
 
-def scrape_biodata(driver, wait, profile_url):
-    driver.get(profile_url)
+@timing.timed("twitter.biodata")
+def scrape_biodata(driver, wait, profile_url, navigate=True):
+    if navigate:
+        driver.get(profile_url)
     wait.until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    time.sleep(WAIT_SEC)
+    bio_containers = selectors.wait_for(driver, "twitter.bio_container", STEP_TIMEOUT)
+
+    if PAGE_PARSER == "lxml":
+        return page_parser.twitter_profile(driver.page_source, profile_url)
 
     biodata = {"username": profile_url.rstrip("/").split("/")[-1], "bio": ""}
 
+    if not bio_containers:
+        print("⚠️ Timeout while waiting for profile page to load:", profile_url)
+        return biodata
+
     try:
-        bio_parent = wait.until(
-            EC.presence_of_element_located(
-                (By.CSS_SELECTOR, "div.css-175oi2r.r-3pj75a.r-ttdzmv.r-1ifxtd0")
-            )
-        )
+        bio_parent = bio_containers[0]
         child_divs = bio_parent.find_elements(By.XPATH, "./div")
         if len(child_divs) < 3:
             print("⚠️ Expected at least 3 child divs inside the container but found", len(child_divs))
@@ -84,17 +117,7 @@ def scrape_biodata(driver, wait, profile_url):
 
         third_div = child_divs[2]
 
-        span = None
-        try:
-            span = third_div.find_element(By.XPATH, ".//div/div/div//span[normalize-space(.)!='']")
-        except NoSuchElementException:
-            try:
-                span = third_div.find_element(By.XPATH, ".//div/div//span[normalize-space(.)!='']")
-            except NoSuchElementException:
-                try:
-                    span = third_div.find_element(By.XPATH, ".//span[normalize-space(.)!='']")
-                except NoSuchElementException:
-                    span = None
+        span = selectors.find(third_div, "twitter.bio_span")
 
         if span:
             biodata["bio"] = span.text.strip().replace("\n", " ")
@@ -109,24 +132,251 @@ def scrape_biodata(driver, wait, profile_url):
     return biodata
 
 
-def scrape_biodata_and_posts(driver, wait, profile_url, total_posts=None):
+EXTRACT_TWEETS_JS = r"""
+return Array.from(document.querySelectorAll('article[data-testid="tweet"]')).map(article => {
+    const time = article.querySelector('time');
+    const link = (time && time.closest('a[href*="/status/"]')) || article.querySelector('a[href*="/status/"]');
+    const match = link ? link.getAttribute('href').match(/\/status\/(\d+)/) : null;
+    const text = article.querySelector('[data-testid="tweetText"]');
+    const images = Array.from(article.querySelectorAll('[data-testid="tweetPhoto"] img, img[src*="/media/"]')).map(img => img.src);
+    const videos = Array.from(article.querySelectorAll('video')).map(video => video.src || video.poster);
+    return {
+        id: match ? match[1] : null,
+        url: link ? link.href : null,
+        text: text ? text.innerText : "",
+        timestamp: time ? time.getAttribute('datetime') : null,
+        media: Array.from(new Set(images.concat(videos).filter(Boolean)))
+    };
+});
+"""
+
+LAST_TWEET_KEY_JS = """
+const articles = document.querySelectorAll('article[data-testid="tweet"]');
+if (!articles.length) return null;
+const last = articles[articles.length - 1];
+const link = last.querySelector('a[href*="/status/"]');
+return link ? link.getAttribute('href') : last.innerText.slice(0, 80);
+"""
+
+
+def extract_tweets_js(driver):
+    return driver.execute_script(EXTRACT_TWEETS_JS)
+
+
+def extract_tweets_html(driver):
+    return page_parser.twitter_timeline(driver.page_source)
+
+
+@timing.timed("twitter.posts")
+def scrape_posts_bulk(driver, total_posts, extract=extract_tweets_js):
+    posts = []
+    seen = set()
+    stalls = 0
+
+    waits.until(driver, "twitter.timeline", lambda d: d.find_elements(By.CSS_SELECTOR, 'article[data-testid="tweet"]'), STEP_TIMEOUT)
+    while len(posts) < total_posts and stalls < MAX_SCROLL_STALLS and not deadline.expired():
+        new_posts = 0
+        for tweet in extract(driver):
+            key = tweet["id"] or tweet["text"]
+            if key in seen:
+                continue
+            seen.add(key)
+            new_posts += 1
+            caption = tweet["text"].strip().replace("\n", " ")
+            posts.append({
+                "id": tweet["id"],
+                "url": tweet["url"],
+                "caption": caption,
+                "timestamp": tweet["timestamp"],
+                "media": tweet["media"],
+            })
+            print(f"  📝 Post {len(posts)} caption: {caption[:60]}...")
+            if len(posts) >= total_posts:
+                break
+
+        if len(posts) >= total_posts:
+            break
+        stalls = 0 if new_posts else stalls + 1
+
+        last_key = driver.execute_script(LAST_TWEET_KEY_JS)
+        driver.execute_script("window.scrollBy(0, window.innerHeight * 2);")
+        waits.until(driver, "twitter.bulk_scroll", lambda d: d.execute_script(LAST_TWEET_KEY_JS) != last_key, STEP_TIMEOUT)
+
+    if len(posts) < total_posts:
+        print("ℹ️ No more posts found or reached end of feed.")
+    return posts
+
+
+def is_timeline_api(url):
+    return "/graphql/" in url and ("/UserByScreenName" in url or "/UserTweets" in url)
+
+
+def tweet_timestamp(created_at):
+    try:
+        return datetime.strptime(created_at, "%a %b %d %H:%M:%S %z %Y").strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    except (TypeError, ValueError):
+        return None
+
+
+def tweet_media(legacy):
+    media = []
+    for item in (legacy.get("extended_entities") or legacy.get("entities") or {}).get("media") or []:
+        variants = [v for v in (item.get("video_info") or {}).get("variants") or [] if v.get("content_type") == "video/mp4"]
+        if variants:
+            media.append(max(variants, key=lambda v: v.get("bitrate", 0))["url"])
+        elif item.get("media_url_https"):
+            media.append(item["media_url_https"])
+    return media
+
+
+def parse_tweet_result(result):
+    if not result:
+        return None
+    if result.get("__typename") == "TweetWithVisibilityResults":
+        result = result.get("tweet") or {}
+    legacy = result.get("legacy")
+    if not legacy:
+        return None
+
+    note = ((result.get("note_tweet") or {}).get("note_tweet_results") or {}).get("result") or {}
+    text = note.get("text") or legacy.get("full_text") or ""
+    user_result = ((result.get("core") or {}).get("user_results") or {}).get("result") or {}
+    screen_name = (user_result.get("legacy") or {}).get("screen_name") or (user_result.get("core") or {}).get("screen_name")
+    tweet_id = legacy.get("id_str") or result.get("rest_id")
+
+    return {
+        "id": tweet_id,
+        "url": f"https://x.com/{screen_name or 'i/web'}/status/{tweet_id}",
+        "caption": text.strip().replace("\n", " "),
+        "timestamp": tweet_timestamp(legacy.get("created_at")),
+        "media": tweet_media(legacy),
+    }
+
+
+def parse_user_payload(payload):
+    result = (((payload or {}).get("data") or {}).get("user") or {}).get("result") or {}
+    legacy = result.get("legacy")
+    if legacy is None or "timeline_v2" in result or "timeline" in result:
+        return None
+
+    bio = (result.get("profile_bio") or {}).get("description") or legacy.get("description") or ""
+    return {
+        "username": legacy.get("screen_name") or (result.get("core") or {}).get("screen_name"),
+        "bio": bio.strip().replace("\n", " "),
+    }
+
+
+def parse_timeline_payload(payload):
+    result = (((payload or {}).get("data") or {}).get("user") or {}).get("result") or {}
+    timeline = (result.get("timeline_v2") or result.get("timeline") or {}).get("timeline") or {}
+
+    tweets = []
+    cursor = None
+    for instruction in timeline.get("instructions") or []:
+        entries = instruction.get("entries") or ([instruction["entry"]] if instruction.get("entry") else [])
+        for entry in entries:
+            content = entry.get("content") or {}
+            if content.get("cursorType") == "Bottom":
+                cursor = content.get("value")
+                continue
+            items = [content.get("itemContent")] + [i.get("item", {}).get("itemContent") for i in content.get("items") or []]
+            for item in items:
+                tweet = parse_tweet_result(((item or {}).get("tweet_results") or {}).get("result"))
+                if tweet:
+                    tweets.append(tweet)
+    return tweets, cursor
+
+
+@timing.timed("twitter.network_profile")
+def scrape_profile_network(driver, profile_url, total_posts, navigate=True):
+    capture = network_capture(driver)
+    if navigate:
+        capture.clear()
+        driver.get(profile_url)
+
+    username = profile_url.rstrip("/").split("/")[-1]
+    state = {"user": None, "posts": [], "seen": set()}
+
+    def absorb():
+        for _, payload in capture.poll(is_timeline_api):
+            user = parse_user_payload(payload)
+            if user and (user["username"] or "").lower() == username.lower():
+                state["user"] = user
+            tweets, _ = parse_timeline_payload(payload)
+            for tweet in tweets:
+                if tweet["id"] in state["seen"]:
+                    continue
+                state["seen"].add(tweet["id"])
+                state["posts"].append(tweet)
+
+    def profile_loaded(_):
+        absorb()
+        return state["user"] is not None and state["posts"]
+
+    waits.until(driver, "twitter.network_profile", profile_loaded, STEP_TIMEOUT)
+    if state["user"] is None:
+        print(f"⚠️ No UserByScreenName payload captured for {profile_url}, falling back to DOM extraction")
+        return None
+
+    stalls = 0
+    while len(state["posts"]) < total_posts and stalls < MAX_SCROLL_STALLS and not deadline.expired():
+        before = len(state["posts"])
+
+        def posts_grew(_):
+            absorb()
+            return len(state["posts"]) > before
+
+        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
+        stalls = 0 if waits.until(driver, "twitter.network_scroll", posts_grew, STEP_TIMEOUT) else stalls + 1
+
+    posts = state["posts"][:total_posts]
+    for i, post in enumerate(posts):
+        print(f"  📝 Post {i + 1} caption: {post['caption'][:60]}...")
+    return {"username": username, "bio": state["user"]["bio"], "captions": [p["caption"] for p in posts], "posts": posts}
+
+
+def post_xpath_at(post_index):
+    return f"/html/body/div[1]/div/div/div[2]/main/div/div/div/div/div/div[3]/div/div/section/div/div/div[{post_index}]"
+
+
+def scrape_biodata_and_posts(driver, wait, profile_url, total_posts=None, extraction=None, navigate=True):
     if total_posts is None:
         total_posts = TOTAL_POSTS_TO_SCRAPE
+    if extraction is None:
+        extraction = TWITTER_EXTRACTION
     
-    biodata = scrape_biodata(driver, wait, profile_url)
+    if extraction == "network":
+        user_data = scrape_profile_network(driver, profile_url, total_posts, navigate)
+        if user_data is not None:
+            return user_data
+        extraction = "html" if PAGE_PARSER == "lxml" else "bulk"
+    else:
+        network_capture(driver).clear()
+
+    biodata = scrape_biodata(driver, wait, profile_url, navigate)
+
+    if extraction in ("bulk", "html"):
+        extract = extract_tweets_html if extraction == "html" else extract_tweets_js
+        posts = scrape_posts_bulk(driver, total_posts, extract)
+        biodata["captions"] = [post["caption"] for post in posts]
+        biodata["posts"] = posts
+        return biodata
+
     biodata["captions"] = []
 
     scraped = 0
     post_index = 1
-    time.sleep(WAIT_SEC)
+    waits.until(driver, "twitter.timeline", lambda d: d.find_elements(By.XPATH, post_xpath_at(1)), STEP_TIMEOUT)
     while scraped < total_posts:
+        if deadline.expired():
+            print("⏱️ Deadline reached, returning posts scraped so far.")
+            break
         try:
             
-            post_xpath = f"/html/body/div[1]/div/div/div[2]/main/div/div/div/div/div/div[3]/div/div/section/div/div/div[{post_index}]"
-            post = driver.find_element(By.XPATH, post_xpath)
+            post = driver.find_element(By.XPATH, post_xpath_at(post_index))
 
             driver.execute_script("arguments[0].scrollIntoView(true);", post)
-            time.sleep(WAIT_SEC)
+            waits.dom_quiet(driver, "twitter.post_scroll", STEP_TIMEOUT)
 
             try:
                 
@@ -144,7 +394,7 @@ def scrape_biodata_and_posts(driver, wait, profile_url, total_posts=None):
 
             post_index += 1
             driver.execute_script("window.scrollBy(0, 600);")
-            time.sleep(WAIT_SEC)
+            waits.until(driver, "twitter.next_post", lambda d: d.find_elements(By.XPATH, post_xpath_at(post_index)), STEP_TIMEOUT)
 
         except Exception:
             print("ℹ️ No more posts found or reached end of feed.")
@@ -156,72 +406,191 @@ def scrape_biodata_and_posts(driver, wait, profile_url, total_posts=None):
 
 
 app = Flask(__name__)
+profiling.install(app, "xtwitter")
 
-driver = None
-wait = None
-
-def initialize_driver(wait_sec):
-    global driver, wait
-    if driver is None:
-        driver, wait = setup_driver()
-        login_with_cookies(driver, wait_sec)
+def create_logged_in_driver():
+    driver, wait = setup_driver()
+    try:
+        login_with_cookies(driver, 0)
+    except Exception:
+        driver.quit()
+        raise
     return driver, wait
 
+
+driver_pool = DriverPool(create_logged_in_driver, size=DRIVER_POOL_SIZE, max_pages=DRIVER_MAX_PAGES)
+
+def profile_url_for(username):
+    return f"https://x.com/{username.strip('/')}" if not username.startswith('http') else username
+
+def iter_scrape_local(usernames, total_posts, extraction=None, tabs=None, deadline_at=None, timings=False):
+    if tabs is None:
+        tabs = TABS_PER_BROWSER
+
+    with deadline.scope(deadline_at), driver_pool.session() as session:
+        def scrape_one(username, navigate):
+            print(f"🔎 Scraping Twitter user: {username}")
+            with timing.collect(timings) as user_timings:
+                with timing.span("twitter.profile"):
+                    user_data = scrape_biodata_and_posts(session.driver, session.wait, profile_url_for(username), total_posts=total_posts, extraction=extraction, navigate=navigate)
+            session.mark_page()
+            if user_timings is not None:
+                user_data["timings"] = timing.rounded(user_timings)
+            return user_data
+
+        scheduler = TabScheduler(session.driver, min(tabs, len(usernames)) or 1, load_timeout=STEP_TIMEOUT * 3)
+        for username, user_data, error in scheduler.run(usernames, profile_url_for, scrape_one, stop=deadline.expired):
+            if error is None:
+                yield {"type": "result", "username": username, "data": user_data}
+            elif isinstance(error, deadline.DeadlineExceeded):
+                yield {"type": "unreached", "username": username}
+            else:
+                yield {"type": "error", "username": username, "error": str(error)}
+
+worker_pool = WorkerPool("xtwitter", WORKER_PROCESSES, max_tasks=WORKER_MAX_TASKS) if WORKER_PROCESSES > 0 else None
+
+def iter_scrape(usernames, total_posts, extraction=None, tabs=None, deadline_at=None, timings=False):
+    if worker_pool is None:
+        yield from iter_scrape_local(usernames, total_posts, extraction, tabs, deadline_at, timings)
+        return
+    yield from worker_pool.scrape(usernames, total_posts=total_posts, extraction=extraction, tabs=tabs, deadline_at=deadline_at, timings=timings)
+
+def warm_up():
+    if worker_pool is not None:
+        worker_pool.start()
+        return
+    if WARM_BROWSERS > 0:
+        driver_pool.start_warm_up(WARM_BROWSERS)
+    else:
+        threading.Thread(target=chromedriver_path, name="chromedriver-lookup", daemon=True).start()
+
+def is_ready():
+    if worker_pool is not None:
+        return worker_pool.stats()["alive"] > 0
+    return driver_pool.stats()["idle"] > 0 or driver_pool.warm_state in ("ready", "degraded")
+
+def parse_scrape_request(data):
+    if not data or 'usernames' not in data:
+        return None, (jsonify({"error": "Please provide 'usernames' in request body"}), 400)
+    
+    if not isinstance(data['usernames'], list):
+        return None, (jsonify({"error": "'usernames' must be a list"}), 400)
+    
+    return data['usernames'], None
+
+def parse_deadline(data):
+    try:
+        return deadline.from_seconds(data.get('deadline_sec')), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'deadline_sec' must be a non-negative number"}), 400)
+
+def parse_tabs(data):
+    try:
+        return max(1, min(int(data.get('tabs', TABS_PER_BROWSER)), MAX_TABS_PER_BROWSER)), None
+    except (TypeError, ValueError):
+        return None, (jsonify({"error": "'tabs' must be an integer"}), 400)
+
 @app.route('/scrape', methods=['POST'])
 def scrape():
-    global driver, wait
     data = request.get_json()
-    total_posts = data.get('total_posts', 5) if data else 5
+    usernames, error = parse_scrape_request(data)
+    if error:
+        return error
     
-    if not data or 'usernames' not in data:
-        return jsonify({"error": "Please provide 'usernames' in request body"}), 400
-    
-    usernames = data['usernames']
-    if not isinstance(usernames, list):
-        return jsonify({"error": "'usernames' must be a list"}), 400
+    total_posts = data.get('total_posts', 5)
+    extraction = data.get('extraction', TWITTER_EXTRACTION)
+    tabs, error = parse_tabs(data)
+    if error:
+        return error
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
     
     try:
-        driver, wait = initialize_driver(0)
-        
         results = []
         errors = []
+        unreached = []
         
-        for username in usernames:
-            try:
-                profile_url = f"https://x.com/{username.strip('/')}" if not username.startswith('http') else username
-                print(f"🔎 Scraping Twitter user: {username}")
-                
-                user_data = scrape_biodata_and_posts(driver, wait, profile_url, total_posts=total_posts)
-                results.append(user_data)
-                
-            except Exception as e:
-                errors.append({"username": username, "error": str(e)})
+        order = {username: i for i, username in enumerate(usernames)}
+        records = sorted(iter_scrape(usernames, total_posts, extraction, tabs, deadline_at, timings), key=lambda r: order.get(r["username"], len(usernames)))
+        for record in records:
+            if record["type"] == "result":
+                results.append(record["data"])
+            elif record["type"] == "unreached":
+                unreached.append(record["username"])
+            else:
+                errors.append({"username": record["username"], "error": record["error"]})
         
         response = {
             "success": True,
             "scraped": len(results),
             "results": results,
+            "truncated": bool(unreached) or (deadline_at is not None and time.time() >= deadline_at),
+            "unreached": unreached,
         }
         
         if errors:
             response["errors"] = errors
             response["success"] = False
         
-        driver.quit()
-        driver = None
-        wait = None
         return jsonify(response)
-        
     except Exception as e:
-        if driver:
-            driver.quit()
-            driver = None
-            wait = None
         return jsonify({"error": str(e), "success": False}), 500
 
+@app.route('/scrape/stream', methods=['POST'])
+def scrape_stream():
+    data = request.get_json()
+    usernames, error = parse_scrape_request(data)
+    if error:
+        return error
+    
+    total_posts = data.get('total_posts', 5)
+    extraction = data.get('extraction', TWITTER_EXTRACTION)
+    tabs, error = parse_tabs(data)
+    if error:
+        return error
+    deadline_at, error = parse_deadline(data)
+    if error:
+        return error
+    timings = bool(data.get('timings', False))
+
+    def generate():
+        scraped = 0
+        errors = 0
+        unreached = []
+        try:
+            for record in iter_scrape(usernames, total_posts, extraction, tabs, deadline_at, timings):
+                if record["type"] == "result":
+                    scraped += 1
+                elif record["type"] == "unreached":
+                    unreached.append(record["username"])
+                else:
+                    errors += 1
+                yield json.dumps(record) + "\n"
+        except Exception as e:
+            errors += 1
+            yield json.dumps({"type": "error", "error": str(e)}) + "\n"
+        truncated = bool(unreached) or (deadline_at is not None and time.time() >= deadline_at)
+        yield json.dumps({"type": "summary", "scraped": scraped, "errors": errors, "truncated": truncated, "unreached": unreached, "success": errors == 0}) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
 @app.route('/sanity', methods=['GET'])
 def health():
-    return jsonify({"status": "ok", "service": "Twitter Scraper"})
+    return jsonify({"status": "ok", "service": "Twitter Scraper", "ready": is_ready(), "browsers": driver_pool.stats(), "workers": worker_pool.stats() if worker_pool else None})
+
+@app.route('/waits', methods=['GET'])
+def wait_stats():
+    return jsonify({"service": "Twitter Scraper", "waits": waits.stats()})
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    return Response(timing.render_metrics("twitter"), mimetype="text/plain; version=0.0.4")
+
+@app.route('/selectors', methods=['GET'])
+def selector_stats():
+    return jsonify({"service": "Twitter Scraper", "selectors": selectors.stats()})
 
 @app.route('/login', methods=['POST'])
 def login():
@@ -230,7 +599,7 @@ def login():
     wait_sec = data.get('wait_sec', 30) if data else 30
     
     try:
-        temp_driver, temp_wait = setup_driver()
+        temp_driver, temp_wait = setup_driver(lean=False)
         login_with_cookies(temp_driver, wait_sec)
         
         return jsonify({"success": True, "message": "Login completed and browser closed"})
@@ -242,4 +611,6 @@ def login():
         temp_driver.quit()
 
 if __name__ == "__main__":
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
+        warm_up()
     app.run(debug=True, host="0.0.0.0", port=5003)